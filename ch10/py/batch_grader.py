@@ -0,0 +1,113 @@
+"""
+Grade retrieved documents concurrently instead of one LLM call after another.
+
+Grading k documents sequentially costs k x LLM latency. ConcurrentGrader runs
+the grader for all documents at once, bounded by a semaphore, caches grades per
+(question, document hash), and can stop as soon as enough relevant documents
+have been found.
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.runnables import Runnable
+
+
+class ConcurrentGrader:
+    def __init__(self, grader: Runnable, max_concurrency: int = 8, cache_size: int = 4096):
+        """
+        Args:
+            grader: runnable taking {"question", "document"} and returning an
+                object with a binary_score of 'yes' or 'no'
+            max_concurrency: maximum number of grading calls in flight
+            cache_size: number of (question, document) grades to remember
+        """
+        self.grader = grader
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(question: str, doc: Document) -> Tuple[str, str]:
+        return question, hashlib.sha256(doc.page_content.encode()).hexdigest()
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[str]:
+        with self._lock:
+            grade = self._cache.get(key)
+            if grade is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return grade
+
+    def _remember(self, key: Tuple[str, str], grade: str) -> None:
+        with self._lock:
+            self._cache[key] = grade
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def agrade(
+        self, question: str, documents: List[Document], min_relevant: Optional[int] = None
+    ) -> List[Tuple[Document, Optional[str]]]:
+        """
+        Grade every document and return (document, grade) pairs in input order.
+
+        With min_relevant set, outstanding calls are cancelled once that many
+        documents were graded 'yes'; their grade is returned as None.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        grades: List[Optional[str]] = [None] * len(documents)
+        enough = asyncio.Event()
+        relevant = 0
+
+        async def grade_one(i: int, doc: Document) -> None:
+            nonlocal relevant
+            key = self._key(question, doc)
+            grade = self._cached(key)
+            if grade is None:
+                async with semaphore:
+                    if enough.is_set():
+                        return
+                    self.llm_calls += 1
+                    score = await self.grader.ainvoke(
+                        {"question": question, "document": doc.page_content}
+                    )
+                grade = score.binary_score
+                self._remember(key, grade)
+            grades[i] = grade
+            if grade == "yes":
+                relevant += 1
+                if min_relevant is not None and relevant >= min_relevant:
+                    enough.set()
+
+        tasks = [asyncio.create_task(grade_one(i, doc)) for i, doc in enumerate(documents)]
+        waiter = asyncio.create_task(enough.wait())
+        try:
+            pending = set(tasks)
+            while pending and not enough.is_set():
+                done, pending = await asyncio.wait(
+                    pending | {waiter}, return_when=asyncio.FIRST_COMPLETED
+                )
+                pending.discard(waiter)
+                for task in done:
+                    if task is not waiter:
+                        task.result()
+        finally:
+            waiter.cancel()
+            for task in tasks:
+                task.cancel()
+        return list(zip(documents, grades))
+
+    def grade(
+        self, question: str, documents: List[Document], min_relevant: Optional[int] = None
+    ) -> List[Tuple[Document, Optional[str]]]:
+        """
+        Synchronous wrapper around agrade for use in sync graph nodes
+        """
+        return asyncio.run(self.agrade(question, documents, min_relevant))
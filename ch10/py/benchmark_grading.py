@@ -0,0 +1,75 @@
+"""
+Compare sequential and concurrent document grading against a stub grader.
+
+The stub sleeps for a fixed latency instead of calling an LLM, so the numbers
+show the scheduling overhead only:
+
+    python benchmark_grading.py --docs 20 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from batch_grader import ConcurrentGrader
+
+
+def make_stub_grader(latency: float) -> RunnableLambda:
+    def grade(inputs):
+        time.sleep(latency)
+        return SimpleNamespace(binary_score="yes" if "relevant" in inputs["document"] else "no")
+
+    async def agrade(inputs):
+        await asyncio.sleep(latency)
+        return SimpleNamespace(binary_score="yes" if "relevant" in inputs["document"] else "no")
+
+    return RunnableLambda(grade, afunc=agrade)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    question = "What is agent memory?"
+    documents = [
+        Document(page_content=f"chunk {i} " + ("relevant" if i % 2 else "off-topic"))
+        for i in range(args.docs)
+    ]
+    stub = make_stub_grader(args.latency)
+
+    start = time.perf_counter()
+    for d in documents:
+        stub.invoke({"question": question, "document": d.page_content})
+    sequential = time.perf_counter() - start
+    print(f"sequential:              {sequential:.2f}s ({args.docs} calls)")
+
+    grader = ConcurrentGrader(stub, max_concurrency=args.concurrency)
+    start = time.perf_counter()
+    grader.grade(question, documents)
+    concurrent = time.perf_counter() - start
+    print(f"concurrent:              {concurrent:.2f}s ({grader.llm_calls} calls)")
+
+    calls = grader.llm_calls
+    start = time.perf_counter()
+    grader.grade(question, documents)
+    print(f"cached:                  {time.perf_counter() - start:.2f}s ({grader.llm_calls - calls} calls)")
+
+    grader = ConcurrentGrader(stub, max_concurrency=args.concurrency)
+    start = time.perf_counter()
+    grades = grader.grade(question, documents, min_relevant=2)
+    graded = sum(grade is not None for _, grade in grades)
+    print(
+        f"early exit (2 relevant): {time.perf_counter() - start:.2f}s "
+        f"({grader.llm_calls} calls, {graded} graded)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Process-level owner of vector indexes referenced from graph state by id.
+
+Graph state only carries a short index id, so checkpoints stay small no matter
+how large the corpus is. The manager keeps the source documents of each index
+and the vector stores built from them in memory, counts how many running nodes
+are using each index, and evicts the least recently used unreferenced entries
+once more than `max_indexes` indexes (or `max_sources` document sets) are
+loaded. An evicted index is rebuilt from its documents on next use.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+Builder = Callable[[List[Document]], VectorStore]
+
+
+class IndexManager:
+    def __init__(self, max_indexes: int = 8, max_sources: int = 32):
+        self.max_indexes = max_indexes
+        self.max_sources = max_sources
+        self._indexes: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._documents: "OrderedDict[str, List[Document]]" = OrderedDict()
+        self._refcounts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, index_id: str) -> bool:
+        with self._lock:
+            return index_id in self._indexes
+
+    def _evict(self, entries: OrderedDict, limit: int, keep: Optional[str] = None) -> None:
+        """Drop least recently used entries that no node is currently using"""
+        for index_id in list(entries):
+            if len(entries) <= limit:
+                return
+            in_use = index_id == keep or self._refcounts.get(index_id, 0) > 0
+            # Documents of a loaded index are what it gets rebuilt from
+            if entries is self._documents and index_id in self._indexes:
+                in_use = True
+            if not in_use:
+                del entries[index_id]
+
+    def put_documents(self, index_id: str, documents: List[Document]) -> str:
+        """
+        Keep the documents an index is built from, and return the id
+        """
+        with self._lock:
+            self._documents[index_id] = documents
+            self._documents.move_to_end(index_id)
+            self._evict(self._documents, self.max_sources, keep=index_id)
+        return index_id
+
+    def ensure(self, index_id: str, build: Builder) -> str:
+        """
+        Build the index for index_id from its documents unless it is already
+        loaded, and return the id
+        """
+        with self._lock:
+            if index_id in self._indexes:
+                self._indexes.move_to_end(index_id)
+                return index_id
+            documents = self._documents.get(index_id)
+        if documents is None:
+            raise KeyError(f"No documents for index {index_id!r}; put_documents() them first")
+        # Build outside the lock so other indexes stay usable meanwhile
+        vectorstore = build(documents)
+        with self._lock:
+            self._indexes.setdefault(index_id, vectorstore)
+            self._indexes.move_to_end(index_id)
+            # Never evict the index that was just built
+            self._evict(self._indexes, self.max_indexes, keep=index_id)
+        return index_id
+
+    @contextmanager
+    def use(self, index_id: str, build: Builder) -> Iterator[VectorStore]:
+        """
+        Pin an index while it is in use, rebuilding it if it was evicted
+        """
+        while True:
+            self.ensure(index_id, build)
+            with self._lock:
+                # Another run may have evicted it between ensure() and here
+                vectorstore = self._indexes.get(index_id)
+                if vectorstore is not None:
+                    self._refcounts[index_id] = self._refcounts.get(index_id, 0) + 1
+                    break
+        try:
+            yield vectorstore
+        finally:
+            with self._lock:
+                self._refcounts[index_id] -= 1
+                if not self._refcounts[index_id]:
+                    del self._refcounts[index_id]
+                self._evict(self._indexes, self.max_indexes)
+
+
+# Shared by every graph run in this process
+index_manager = IndexManager()
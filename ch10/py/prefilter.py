@@ -0,0 +1,121 @@
+"""
+Cheap local relevance checks that run before LLM grading.
+
+Every retrieved chunk already comes with a vector similarity score, and a BM25
+keyword score over the indexed chunks costs microseconds. Chunks that are weak
+on both signals are dropped, chunks that are strong on both are accepted, and
+only the ambiguous middle is sent to the LLM grader.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to was were what when where which who why with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 statistics over the chunks that were added to the vector store
+    """
+
+    def __init__(self, documents: Sequence[Document], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        doc_freq: Counter = Counter()
+        total_length = 0
+        for doc in documents:
+            tokens = tokenize(doc.page_content)
+            total_length += len(tokens)
+            doc_freq.update(set(tokens))
+        self.num_docs = max(len(documents), 1)
+        self.avg_length = total_length / self.num_docs or 1.0
+        self.idf = {
+            term: math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+        # Terms never seen while indexing get the highest possible idf
+        self.default_idf = math.log(1 + (self.num_docs + 0.5) / 0.5)
+
+    def score(self, query: str, text: str) -> float:
+        """
+        BM25 score of text for query, normalized to 0..1 by the score of an
+        average-length document containing every query term once
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return 0.0
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        length_norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_length)
+        score = 0.0
+        best = 0.0
+        for term in query_terms:
+            idf = self.idf.get(term, self.default_idf)
+            best += idf
+            tf = counts.get(term, 0)
+            if tf:
+                score += idf * tf * (self.k1 + 1) / (tf + length_norm)
+        return min(score / best, 1.0)
+
+
+@dataclass
+class PreFilterReport:
+    accepted: List[Document] = field(default_factory=list)
+    rejected: List[Document] = field(default_factory=list)
+    ambiguous: List[Document] = field(default_factory=list)
+
+    @property
+    def llm_calls_saved(self) -> int:
+        return len(self.accepted) + len(self.rejected)
+
+
+class PreFilter:
+    def __init__(
+        self,
+        bm25: BM25Index,
+        reject_similarity: float = 0.55,
+        accept_similarity: float = 0.8,
+        reject_bm25: float = 0.05,
+        accept_bm25: float = 0.5,
+    ):
+        """
+        Args:
+            bm25: keyword statistics for the indexed chunks
+            reject_similarity: drop chunks below this vector similarity ...
+            reject_bm25: ... when their normalized BM25 score is also below this
+            accept_similarity: accept chunks at or above this vector similarity ...
+            accept_bm25: ... when their normalized BM25 score is also at or above this
+        """
+        self.bm25 = bm25
+        self.reject_similarity = reject_similarity
+        self.accept_similarity = accept_similarity
+        self.reject_bm25 = reject_bm25
+        self.accept_bm25 = accept_bm25
+
+    def split(self, question: str, scored_docs: Sequence[Tuple[Document, float]]) -> PreFilterReport:
+        """
+        Sort (document, similarity) pairs, as returned by
+        similarity_search_with_score, into accepted, rejected and ambiguous
+        """
+        report = PreFilterReport()
+        for doc, similarity in scored_docs:
+            keyword = self.bm25.score(question, doc.page_content)
+            if similarity >= self.accept_similarity and keyword >= self.accept_bm25:
+                report.accepted.append(doc)
+            elif similarity < self.reject_similarity and keyword < self.reject_bm25:
+                report.rejected.append(doc)
+            else:
+                report.ambiguous.append(doc)
+        return report
@@ -1,11 +1,13 @@
+import hashlib
 from typing import List, TypedDict
-from langchain_community.document_loaders import WebBaseLoader
 from langchain.schema import Document
 from langgraph.graph import END, StateGraph, START
 from langchain_community.vectorstores import InMemoryVectorStore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain import hub
+from prompt_registry import get_prompt
+from web_fetch import fetch_pages, pages_to_documents
+from index_manager import index_manager
 import os
 from dotenv import load_dotenv
 
@@ -19,41 +21,49 @@ class GraphState(TypedDict):
 
     Attributes:
         question: question
-        scraped_documents: list of documents
-        vectorstore: vectorstore
+        index_id: content hash of the scraped documents; the index manager
+            holds the documents and the vector index built from them
     """
 
     question: str
-    scraped_documents: List[str]
-    vectorstore: InMemoryVectorStore
+    index_id: str
     answer: str
 
 
-def scrape_blog_posts(state) -> List[Document]:
+urls = [
+    "https://blog.langchain.dev/top-5-langgraph-agents-in-production-2024/",
+    "https://blog.langchain.dev/langchain-state-of-ai-2024/",
+    "https://blog.langchain.dev/introducing-ambient-agents/",
+]
+
+
+def _content_hash(docs: List[Document]) -> str:
+    digest = hashlib.sha256()
+    for doc in docs:
+        digest.update(doc.metadata.get("source", "").encode())
+        digest.update(doc.page_content.encode())
+    return digest.hexdigest()
+
+
+async def scrape_blog_posts(state) -> List[Document]:
     """
     Scrape the blog posts and create a list of documents
     """
 
-    urls = [
-        "https://blog.langchain.dev/top-5-langgraph-agents-in-production-2024/",
-        "https://blog.langchain.dev/langchain-state-of-ai-2024/",
-        "https://blog.langchain.dev/introducing-ambient-agents/",
-    ]
+    # Fetch all pages concurrently; unchanged pages are served from the on-disk cache
+    pages = await fetch_pages(urls)
+    docs_list = pages_to_documents(pages)
 
-    docs = [WebBaseLoader(url).load() for url in urls]
-    docs_list = [item for sublist in docs for item in sublist]
+    # The documents stay in the index manager; the state only gets their hash
+    index_id = index_manager.put_documents(_content_hash(docs_list), docs_list)
+    return {"index_id": index_id}
 
-    return {"scraped_documents": docs_list}
 
-
-def indexing(state):
-    """
-    Index the documents
-    """
+def _build_index(scraped_documents: List[Document]) -> InMemoryVectorStore:
     text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
         chunk_size=250, chunk_overlap=0
     )
-    doc_splits = text_splitter.split_documents(state["scraped_documents"])
+    doc_splits = text_splitter.split_documents(scraped_documents)
 
 # Add to vectorDB
     vectorstore = InMemoryVectorStore.from_documents(
@@ -63,7 +73,16 @@ def indexing(state):
             google_api_key=os.getenv("GOOGLE_API_KEY")
         ),
     )
-    return {"vectorstore": vectorstore}
+    return vectorstore
+
+
+def indexing(state):
+    """
+    Index the documents, reusing the index built for identical content.
+    The index manager owns both the documents and the vectors.
+    """
+    index_manager.ensure(state["index_id"], _build_index)
+    return {}
 
 
 def retrieve_and_generate(state):
@@ -71,11 +90,8 @@ def retrieve_and_generate(state):
     Retrieve documents from vectorstore and generate answer
     """
     question = state["question"]
-    vectorstore = state["vectorstore"]
-
-    retriever = vectorstore.as_retriever()
 
-    prompt = hub.pull("rlm/rag-prompt")
+    prompt = get_prompt("rlm/rag-prompt")
     llm = ChatGoogleGenerativeAI(
         model="gemini-2.5-flash",
         temperature=0,
@@ -83,7 +99,8 @@ def retrieve_and_generate(state):
     )
 
     # fetch relevant documents
-    docs = retriever.invoke(question)  # format prompt
+    with index_manager.use(state["index_id"], _build_index) as vectorstore:
+        docs = vectorstore.as_retriever().invoke(question)  # format prompt
     formatted = prompt.invoke(
         {"context": docs, "question": question})  # generate answer
     answer = llm.invoke(formatted)
@@ -1,9 +1,11 @@
+from typing import Optional
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.vectorstores import InMemoryVectorStore
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
+from prefilter import BM25Index, PreFilter
 import os
 from dotenv import load_dotenv
 
@@ -78,6 +80,45 @@ grade_prompt = ChatPromptTemplate.from_messages(
 
 retrieval_grader = grade_prompt | structured_llm_grader
 
+# Cheap vector-similarity + BM25 checks so only ambiguous chunks reach the LLM.
+# Built on first use, so importing this module does not index the chunks again.
+_prefilter: Optional[PreFilter] = None
+
+
+def get_prefilter() -> PreFilter:
+    global _prefilter
+    if _prefilter is None:
+        _prefilter = PreFilter(
+            BM25Index(doc_splits),
+            reject_similarity=float(os.getenv("PREFILTER_REJECT_SIMILARITY", 0.55)),
+            accept_similarity=float(os.getenv("PREFILTER_ACCEPT_SIMILARITY", 0.8)),
+            reject_bm25=float(os.getenv("PREFILTER_REJECT_BM25", 0.05)),
+            accept_bm25=float(os.getenv("PREFILTER_ACCEPT_BM25", 0.5)),
+        )
+    return _prefilter
+
+
+def retrieve_and_grade(question, k=4):
+    """
+    Retrieve k chunks and return the relevant ones, grading with the LLM only
+    the chunks the pre-filter could not decide on
+    """
+    scored_docs = vectorstore.similarity_search_with_score(question, k=k)
+    report = get_prefilter().split(question, scored_docs)
+    relevant = list(report.accepted)
+    for doc in report.ambiguous:
+        score = retrieval_grader.invoke(
+            {"question": question, "document": doc.page_content}
+        )
+        if score.binary_score == "yes":
+            relevant.append(doc)
+    print(
+        f"Pre-filter: {len(report.accepted)} accepted, {len(report.rejected)} rejected, "
+        f"{len(report.ambiguous)} sent to LLM ({report.llm_calls_saved} LLM calls saved)"
+    )
+    return relevant
+
+
 # --- Grade retrieved documents ---
 
 question = "What are 2 LangGraph agents used in production in 2024?"
@@ -90,3 +131,9 @@ doc_txt = docs[0].page_content
 result = retrieval_grader.invoke({"question": question, "document": doc_txt})
 
 print("\n\nGrade Result: \n", result)
+
+if __name__ == "__main__":
+    # Only when run directly: search_graph imports this module for its grader
+    relevant_docs = retrieve_and_grade(question)
+
+    print("\n\nRelevant documents after pre-filter: \n", len(relevant_docs))
@@ -6,6 +6,7 @@ from langgraph.graph import END, StateGraph, START
 
 from retrieve_and_grade import retrieval_grader
 from retrieve_and_grade import retriever
+from batch_grader import ConcurrentGrader
 from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
 import os
@@ -15,9 +16,9 @@ from dotenv import load_dotenv
 load_dotenv()
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain import hub  # Prompt
+from prompt_registry import get_prompt  # Prompt
 
-prompt = hub.pull("rlm/rag-prompt")
+prompt = get_prompt("rlm/rag-prompt")
 
 # LLM
 llm = ChatGoogleGenerativeAI(
@@ -43,6 +44,9 @@ re_write_prompt = ChatPromptTemplate.from_messages(
 
 question_rewriter = re_write_prompt | llm | StrOutputParser()
 
+# Grades all retrieved documents in parallel and remembers grades per question
+grader = ConcurrentGrader(retrieval_grader, max_concurrency=8)
+
 # --- Create the graph ---
 
 web_search_tool = DuckDuckGoSearchRun()
@@ -114,14 +118,10 @@ def grade_documents(state):
     question = state["question"]
     documents = state["documents"]
 
-    # Score each doc
+    # Score all docs concurrently
     filtered_docs = []
     web_search = "No"
-    for d in documents:
-        score = retrieval_grader.invoke(
-            {"question": question, "document": d.page_content}
-        )
-        grade = score.binary_score
+    for d, grade in grader.grade(question, documents):
         if grade == "yes":
             print("---GRADE: DOCUMENT RELEVANT---")
             filtered_docs.append(d)
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web_fetch import fetch_pages, pages_to_documents
+
+PAGES = {
+    "/post-1": "<html><head><title>Post 1</title></head><body>Agents</body></html>",
+    "/post-2": "<html><head><title>Post 2</title></head><body>Prompts</body></html>",
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    statuses: list = []
+
+    def do_GET(self):
+        body = PAGES[self.path].encode()
+        etag = f'"{self.path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.statuses.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.statuses = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_second_fetch_revalidates_and_serves_the_cache(stub_server, tmp_path):
+    urls = [stub_server + path for path in PAGES]
+
+    first = asyncio.run(fetch_pages(urls, cache_dir=str(tmp_path)))
+    assert StubHandler.statuses == [200, 200]
+    assert not any(page.from_cache for page in first)
+
+    second = asyncio.run(fetch_pages(urls, cache_dir=str(tmp_path)))
+    assert StubHandler.statuses[2:] == [304, 304]
+    assert all(page.from_cache for page in second)
+    assert [page.body for page in second] == [page.body for page in first]
+
+    docs = pages_to_documents(second)
+    assert [doc.metadata["title"] for doc in docs] == ["Post 1", "Post 2"]
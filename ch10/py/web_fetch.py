@@ -0,0 +1,133 @@
+"""
+Concurrent web page fetching with an on-disk cache and conditional requests.
+
+Pages are fetched with httpx in parallel. Every response is stored under
+`cache_dir` together with its ETag / Last-Modified headers, so the next fetch
+sends If-None-Match / If-Modified-Since and a 304 reuses the cached body
+without downloading it again.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+DEFAULT_PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR", ".cache/pages")
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.body.encode()).hexdigest()
+
+
+class PageCache:
+    """
+    Stores fetched pages as JSON files keyed by a hash of the URL
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_PAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return CachedPage(**json.load(f))
+
+    def put(self, page: CachedPage) -> None:
+        path = self._path(page.url)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "url": page.url,
+                    "body": page.body,
+                    "etag": page.etag,
+                    "last_modified": page.last_modified,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+
+async def _fetch_one(client: httpx.AsyncClient, cache: PageCache, url: str) -> CachedPage:
+    cached = cache.get(url)
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    try:
+        response = await client.get(url, headers=headers)
+    except httpx.HTTPError:
+        # Serve the last good copy when the site is unreachable
+        if cached is not None:
+            cached.from_cache = True
+            return cached
+        raise
+
+    if response.status_code == 304 and cached is not None:
+        cached.from_cache = True
+        return cached
+
+    response.raise_for_status()
+    page = CachedPage(
+        url=url,
+        body=response.text,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    cache.put(page)
+    return page
+
+
+async def fetch_pages(
+    urls: list[str],
+    cache_dir: str = DEFAULT_PAGE_CACHE_DIR,
+    max_concurrency: int = 8,
+    timeout: float = 30.0,
+) -> list[CachedPage]:
+    """
+    Fetch all urls concurrently, revalidating cached copies with conditional requests
+    """
+    cache = PageCache(cache_dir)
+    limits = httpx.Limits(max_connections=max_concurrency)
+    async with httpx.AsyncClient(
+        limits=limits, timeout=timeout, follow_redirects=True
+    ) as client:
+        return list(await asyncio.gather(*(_fetch_one(client, cache, url) for url in urls)))
+
+
+def pages_to_documents(pages: list[CachedPage]) -> list[Document]:
+    """
+    Extract the page text the same way WebBaseLoader does (BeautifulSoup get_text)
+    """
+    docs = []
+    for page in pages:
+        soup = BeautifulSoup(page.body, "html.parser")
+        metadata = {"source": page.url}
+        if soup.title and soup.title.string:
+            metadata["title"] = soup.title.string
+        docs.append(Document(page_content=soup.get_text(), metadata=metadata))
+    return docs
@@ -0,0 +1,90 @@
+"""
+Benchmark the vectorized fusion module against the dict-based
+reciprocal_rank_fusion from d-rag-fusion.py.
+
+    python benchmark_fusion.py --lists 2000 --docs-per-list 200 --pool 20000
+"""
+
+import argparse
+import random
+import time
+
+from langchain_core.documents import Document
+
+from fusion import comb_mnz, comb_sum, reciprocal_rank_fusion
+
+
+def dict_reciprocal_rank_fusion(results, k=60):
+    """The original implementation, keyed by page_content"""
+    fused_scores = {}
+    documents = {}
+    for docs in results:
+        for rank, doc in enumerate(docs):
+            doc_str = doc.page_content
+            if doc_str not in fused_scores:
+                fused_scores[doc_str] = 0
+                documents[doc_str] = doc
+            fused_scores[doc_str] += 1 / (rank + k)
+    reranked_doc_strs = sorted(fused_scores, key=lambda d: fused_scores[d], reverse=True)
+    return [documents[doc_str] for doc_str in reranked_doc_strs]
+
+
+def timed(label, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32}{best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lists", type=int, default=2000)
+    parser.add_argument("--docs-per-list", type=int, default=200)
+    parser.add_argument("--pool", type=int, default=20000)
+    parser.add_argument("--doc-size", type=int, default=2000, help="characters per document")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pool = [
+        Document(
+            page_content=f"doc {i} " + "x" * args.doc_size,
+            metadata={"uuid": f"doc-{i}"},
+        )
+        for i in range(args.pool)
+    ]
+    # Each list holds fresh copies, as if returned by a separate store query;
+    # new string objects so their hashes are not already cached
+    results = [
+        [
+            Document(
+                page_content="".join([pool[i].page_content[:1], pool[i].page_content[1:]]),
+                metadata=dict(pool[i].metadata),
+                id=pool[i].metadata["uuid"],
+            )
+            for i in rng.sample(range(args.pool), args.docs_per_list)
+        ]
+        for _ in range(args.lists)
+    ]
+    scored = [[(doc, 1.0 - rank / args.docs_per_list) for rank, doc in enumerate(docs)] for docs in results]
+    print(f"{args.lists} lists x {args.docs_per_list} docs, {args.pool} distinct documents\n")
+
+    expected = timed("dict RRF (page_content)", lambda: dict_reciprocal_rank_fusion(results), args.repeat)
+    fused = timed("vectorized RRF (all)", lambda: reciprocal_rank_fusion(results), args.repeat)
+    top = timed(f"vectorized RRF (top {args.top_k})", lambda: reciprocal_rank_fusion(results, top_k=args.top_k), args.repeat)
+    weights = [rng.uniform(0.5, 1.5) for _ in results]
+    timed("weighted RRF", lambda: reciprocal_rank_fusion(results, weights=weights, top_k=args.top_k), args.repeat)
+    timed("CombSUM", lambda: comb_sum(scored, top_k=args.top_k), args.repeat)
+    timed("CombMNZ", lambda: comb_mnz(scored, top_k=args.top_k), args.repeat)
+
+    same_order = [d.metadata["uuid"] for d in fused[:100]] == [d.metadata["uuid"] for d in expected[:100]]
+    same_top = [d.metadata["uuid"] for d in top] == [d.metadata["uuid"] for d in expected[: args.top_k]]
+    print(f"\nsame ranking as dict RRF: {same_order}, same top {args.top_k}: {same_top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark semantic routing latency with a stub embedding model.
+
+Compares the per-request work of the original prompt_router (convert the list
+of prompt embeddings, cosine similarity, PromptTemplate.from_template) with
+SemanticRouter, cold and with a warm query cache. The stub embeds instantly,
+so the numbers exclude the embedding API call itself; --embed-latency adds it.
+
+    python benchmark_router.py --routes 300 --exemplars 5
+"""
+
+import argparse
+import hashlib
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.prompts import PromptTemplate
+
+from semantic_routing import Route, SemanticRouter
+
+
+class StubEmbeddings(Embeddings):
+    """Deterministic pseudo-random vectors seeded by the text"""
+
+    def __init__(self, dims: int = 768, latency: float = 0.0):
+        self.dims = dims
+        self.latency = latency
+        self.calls = 0
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dims).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._vector(text)
+
+
+def cosine_similarity(x, y):
+    """Same computation as langchain.utils.math.cosine_similarity"""
+    x, y = np.array(x), np.array(y)
+    x_norm = np.linalg.norm(x, axis=1)
+    y_norm = np.linalg.norm(y, axis=1)
+    return np.dot(x, y.T) / np.outer(x_norm, y_norm)
+
+
+def per_request_ms(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=300)
+    parser.add_argument("--exemplars", type=int, default=5)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embed-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    embeddings = StubEmbeddings(args.dims, args.embed_latency)
+    routes = [
+        Route(
+            f"route-{r}",
+            f"You are expert {r}. Here is a question: {{query}}",
+            [f"example question {e} for route {r}" for e in range(args.exemplars)],
+        )
+        for r in range(args.routes)
+    ]
+    queries = [f"user question {i}" for i in range(args.queries)]
+    print(f"{args.routes} routes x {args.exemplars} exemplars, {args.dims} dims\n")
+
+    # Original: a Python list of embeddings, one template per route
+    templates = [route.template for route in routes]
+    prompt_embeddings = embeddings.embed_documents(templates)
+
+    def original(query):
+        query_embedding = embeddings.embed_query(query)
+        similarity = cosine_similarity([query_embedding], prompt_embeddings)[0]
+        return PromptTemplate.from_template(templates[similarity.argmax()])
+
+    print(f"original prompt_router       {per_request_ms(original, queries):8.3f} ms/query")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        SemanticRouter(routes, embeddings, cache_dir=cache_dir)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        router = SemanticRouter(routes, embeddings, cache_dir=cache_dir)
+        load = time.perf_counter() - start
+        print(f"build route matrix           {build * 1000:8.1f} ms (load from disk {load * 1000:.1f} ms)")
+
+        def routed(query):
+            route, _ = router.route(query)
+            return router.template(route)
+
+        print(f"SemanticRouter (cold query)  {per_request_ms(routed, queries):8.3f} ms/query")
+        print(f"SemanticRouter (cached)      {per_request_ms(routed, queries):8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
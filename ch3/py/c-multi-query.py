@@ -7,6 +7,8 @@ from langchain_postgres.vectorstores import PGVector
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import chain
+from langchain_core.output_parsers import StrOutputParser
+from fan_out import FanOutRetriever
 
 load_dotenv()
 
@@ -38,12 +40,7 @@ perspectives_prompt = ChatPromptTemplate.from_template(
 
 llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY"))
 
-
-def parse_queries_output(message):
-    return message.content.split('\n')
-
-
-query_gen = perspectives_prompt | llm | parse_queries_output
+query_gen = perspectives_prompt | llm | StrOutputParser()
 
 
 def get_unique_union(document_lists):
@@ -54,7 +51,9 @@ def get_unique_union(document_lists):
     return list(deduped_docs.values())
 
 
-retrieval_chain = query_gen | retriever.batch | get_unique_union
+# Search for each generated query as soon as its line has been streamed
+fan_out = FanOutRetriever(query_gen, db, embeddings_model, k=5, max_queries=5)
+retrieval_chain = fan_out.as_runnable() | get_unique_union
 
 prompt = ChatPromptTemplate.from_template(
     """Answer the question based only on the following context: {context} Question: {question} """
@@ -7,6 +7,9 @@ from langchain_postgres.vectorstores import PGVector
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import chain
+from langchain_core.output_parsers import StrOutputParser
+from fan_out import FanOutRetriever
+from fusion import reciprocal_rank_fusion
 
 load_dotenv()
 
@@ -48,30 +51,18 @@ print("generated queries: ", generated_queries)
 
 """
 we fetch relevant documents for each query and pass them into a function to rerank (that is, reorder according to relevancy) the final list of relevant documents.
+
+reciprocal_rank_fusion (fusion.py) scores all lists at once with NumPy, and also comes in weighted and CombSUM/CombMNZ flavours. It is keyed on page_content here: PGVector.from_documents gives every chunk a new id on each run of this script, so the same chunk can be stored, and retrieved, under several ids.
 """
 
 
-def reciprocal_rank_fusion(results: list[list], k=60):
-    """reciprocal rank fusion on multiple lists of ranked documents and an optional parameter k used in the RRF formula"""
-    # Initialize a dictionary to hold fused scores for each document
-    # Documents will be keyed by their contents to ensure uniqueness
-    fused_scores = {}
-    documents = {}
-    for docs in results:
-        # Iterate through each document in the list, with its rank (position in the list)
-        for rank, doc in enumerate(docs):
-            doc_str = doc.page_content
-            if doc_str not in fused_scores:
-                fused_scores[doc_str] = 0
-                documents[doc_str] = doc
-            fused_scores[doc_str] += 1 / (rank + k)
-    # sort the documents based on their fused scores in descending order to get the final reranked results
-    reranked_doc_strs = sorted(
-        fused_scores, key=lambda d: fused_scores[d], reverse=True)
-    return [documents[doc_str] for doc_str in reranked_doc_strs]
-
-
-retrieval_chain = query_gen | retriever.batch | reciprocal_rank_fusion
+# Search for each generated query as soon as its line has been streamed
+fan_out = FanOutRetriever(
+    prompt_rag_fusion | llm | StrOutputParser(), db, embeddings_model, k=5, max_queries=4
+)
+retrieval_chain = fan_out.as_runnable() | (
+    lambda results: reciprocal_rank_fusion(results, key=lambda doc: doc.page_content)
+)
 
 result = retrieval_chain.invoke(query)
 
@@ -8,6 +8,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import chain
 from langchain_core.output_parsers import StrOutputParser
+from hyde import PASSAGE_SEPARATOR, HydeRetriever
 
 load_dotenv()
 
@@ -29,16 +30,31 @@ db = PGVector.from_documents(
 # create retriever to retrieve 2 relevant documents
 retriever = db.as_retriever(search_kwargs={"k": 5})
 
-prompt_hyde = ChatPromptTemplate.from_template(
-    """Please write a passage to answer the question.\n Question: {question} \n Passage:""")
+# Hypothetical passages are capped at about HYDE_MAX_TOKENS each. With more than
+# one passage, a single call writes all of them, separated by PASSAGE_SEPARATOR
+# lines
+HYDE_MAX_TOKENS = 256
+HYDE_NUM_PASSAGES = 3
 
-generate_doc = (prompt_hyde | ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY")) | StrOutputParser())
+if HYDE_NUM_PASSAGES == 1:
+    prompt_hyde = ChatPromptTemplate.from_template(
+        """Please write a passage to answer the question.\n Question: {question} \n Passage:""")
+else:
+    prompt_hyde = ChatPromptTemplate.from_template(
+        """Please write {num_passages} different passages to answer the question. Separate the passages with a line containing only {separator}.\n Question: {question} \n Passages:"""
+    ).partial(num_passages=str(HYDE_NUM_PASSAGES), separator=PASSAGE_SEPARATOR)
+
+generate_doc = (prompt_hyde | ChatGoogleGenerativeAI(model="gemini-2.5-flash", max_output_tokens=HYDE_MAX_TOKENS * HYDE_NUM_PASSAGES, google_api_key=os.getenv("GOOGLE_API_KEY")) | StrOutputParser())
 
 """
-Next, we take the hypothetical document generated above and use it as input to the retriever, 
-which will generate its embedding and search for similar documents in the vector store:
+Next, we take the hypothetical documents generated above, embed them in one call and average their embeddings
+into a single query vector, then search for similar documents in the vector store.
+Passages and vectors are cached per question, so asking the same question again skips the LLM:
 """
-retrieval_chain = generate_doc | retriever
+hyde_retriever = HydeRetriever(
+    generate_doc, db, embeddings_model, k=5,
+    num_passages=HYDE_NUM_PASSAGES, max_tokens=HYDE_MAX_TOKENS)
+retrieval_chain = hyde_retriever.as_runnable()
 
 query = "Who are some lesser known philosophers in the ancient greek history of philosophy?"
 
@@ -64,3 +80,7 @@ print("Running hyde\n")
 result = qa.invoke(query)
 print("\n\n")
 print(result.content)
+
+# Retrieving for the same question again is served from the HyDE cache without calling the LLM
+retrieval_chain.invoke(query)
+print(f"\nHyDE cache: {hyde_retriever.hits} hits, {hyde_retriever.misses} misses")
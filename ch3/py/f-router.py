@@ -1,5 +1,7 @@
 
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from typing import Literal
 from langchain_core.prompts import ChatPromptTemplate
@@ -7,6 +9,10 @@ from pydantic import BaseModel, Field
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.runnables import RunnableLambda
 
+# The local router is the one the ch9 retrieval graph uses
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "ch9" / "py" / "src"))
+from retrieval_graph.hybrid_router import CentroidClassifier, HybridRouter
+
 load_dotenv()
 
 
@@ -36,7 +42,41 @@ prompt = ChatPromptTemplate.from_messages(
 )
 
 # Define router
-router = prompt | structured_llm
+llm_router = prompt | structured_llm
+
+# Try a local classifier first and only ask the LLM when it is unsure. Every LLM
+# decision is logged to .cache/router_decisions.jsonl and learned from, and
+# nothing is routed locally before each datasource has 20 examples: a handful
+# of seeds can make the classifier confident and wrong.
+classifier = CentroidClassifier(
+    {
+        "python_docs": [
+            "from langchain_core.prompts import ChatPromptTemplate",
+            "prompt = ChatPromptTemplate.from_messages([('system', 'You are helpful')])",
+            "def my_function(): return None",
+            "pip install langchain",
+            "Why does my Python list comprehension fail?",
+        ],
+        "js_docs": [
+            "import { ChatPromptTemplate } from '@langchain/core/prompts'",
+            "const prompt = ChatPromptTemplate.fromMessages([['system', 'You are helpful']])",
+            "const chain = prompt.pipe(model)",
+            "npm install langchain",
+            "Why does my JavaScript promise never resolve?",
+        ],
+    },
+    log_path=".cache/router_decisions.jsonl",
+)
+hybrid_router = HybridRouter(classifier, threshold=0.8, min_examples=20)
+
+
+def route_query(input):
+    datasource = hybrid_router.route(
+        input["question"], lambda: llm_router.invoke(input).datasource)
+    return RouteQuery(datasource=datasource)
+
+
+router = RunnableLambda(route_query)
 
 # Run
 question = """Why doesn't the following code work: 
@@ -64,3 +104,4 @@ full_chain = router | RunnableLambda(choose_route)
 
 result = full_chain.invoke({"question": question})
 print("\nChoose route: ", result)
+print("\nRouting decisions: ", hybrid_router.stats())
@@ -0,0 +1,147 @@
+"""
+Fan-out retriever for multi-query and RAG-fusion chains.
+
+`query_gen | retriever.batch` waits for the whole LLM answer before the first
+search starts. FanOutRetriever streams the generated text instead, parses one
+query per line as soon as the line is complete, dedupes and caps the queries,
+and searches the vector store for each query while the LLM is still writing
+the rest. Queries that arrive while an embedding call is running are embedded
+together in the next call, so a fast stream ends up as a single batched
+embedding request.
+
+The result is a list of ranked document lists, one per query, which is what
+`reciprocal_rank_fusion` and `get_unique_union` expect.
+"""
+
+import asyncio
+import re
+from typing import AsyncIterator, List
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.vectorstores import VectorStore
+
+# "1. ", "2) ", "- ", "* " prefixes LLMs like to put in front of list items
+_LIST_PREFIX = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+
+def clean_query(line: str) -> str:
+    return _LIST_PREFIX.sub("", line).strip().strip('"').strip()
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+async def iter_query_lines(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Yield each non-empty line of a streamed text as soon as it is complete
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            query = clean_query(line)
+            if query:
+                yield query
+    query = clean_query(buffer)
+    if query:
+        yield query
+
+
+class FanOutRetriever:
+    def __init__(
+        self,
+        query_gen: Runnable,
+        vectorstore: VectorStore,
+        embeddings: Embeddings,
+        k: int = 4,
+        max_queries: int = 5,
+        include_question: bool = False,
+    ):
+        """
+        Args:
+            query_gen: runnable taking the question and streaming text with
+                one generated query per line, e.g. prompt | llm | StrOutputParser()
+            vectorstore: store searched with similarity_search_by_vector
+            embeddings: model used to embed the generated queries
+            k: documents retrieved per query
+            max_queries: generated queries beyond this many are ignored
+            include_question: also search for the original question
+        """
+        self.query_gen = query_gen
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.k = k
+        self.max_queries = max_queries
+        self.include_question = include_question
+        self.last_queries: List[str] = []
+
+    async def _queries(self, question: str) -> AsyncIterator[str]:
+        seen = set()
+        if self.include_question:
+            seen.add(_normalize(question))
+            yield question
+        count = 0
+        async for query in iter_query_lines(self.query_gen.astream(question)):
+            key = _normalize(query)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield query
+            count += 1
+            if count >= self.max_queries:
+                # Stop reading; the rest of the LLM output would be thrown away
+                break
+
+    async def _search(self, vector: List[float]) -> List[Document]:
+        return await asyncio.to_thread(
+            self.vectorstore.similarity_search_by_vector, vector, k=self.k
+        )
+
+    async def aretrieve(self, question: str) -> List[List[Document]]:
+        """
+        Return one ranked document list per generated query, in generation order
+        """
+        queries: List[str] = []
+        pending: List[str] = []
+        searches: List[asyncio.Task] = []
+        arrived = asyncio.Event()
+        finished = False
+
+        async def embed_and_search() -> None:
+            while True:
+                await arrived.wait()
+                arrived.clear()
+                batch, pending[:] = list(pending), []
+                if batch:
+                    vectors = await asyncio.to_thread(self.embeddings.embed_documents, batch)
+                    searches.extend(asyncio.create_task(self._search(v)) for v in vectors)
+                if finished and not pending:
+                    return
+
+        worker = asyncio.create_task(embed_and_search())
+        try:
+            async for query in self._queries(question):
+                queries.append(query)
+                pending.append(query)
+                arrived.set()
+        finally:
+            finished = True
+            arrived.set()
+        await worker
+        self.last_queries = queries
+        return list(await asyncio.gather(*searches))
+
+    def retrieve(self, question: str) -> List[List[Document]]:
+        return asyncio.run(self.aretrieve(question))
+
+    def as_runnable(self) -> Runnable:
+        """
+        Wrap as a runnable so it can be piped into a fusion function:
+        fan_out.as_runnable() | reciprocal_rank_fusion
+        """
+        return RunnableLambda(self.retrieve, afunc=self.aretrieve)
+
@@ -0,0 +1,168 @@
+"""
+Vectorized rank fusion keyed on document ids.
+
+Every input list is mapped to integer document indices once, and all scores
+are accumulated with a single `np.bincount` over the flattened lists. The k-th
+best score is found with `np.partition`, so only the documents scoring at
+least that much are sorted instead of every document seen.
+
+Documents are keyed by `document_id`: the vector store id when the store sets
+one (PGVector and Chroma do), then a "uuid" or "id" metadata entry, and the
+page content only as a last resort.
+
+    reciprocal_rank_fusion(retriever.batch(queries))
+    comb_mnz([vectorstore.similarity_search_with_score(q) for q in queries])
+"""
+
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+Key = Callable[[Document], Hashable]
+
+
+def document_id(doc: Document) -> Hashable:
+    doc_id = getattr(doc, "id", None)
+    if doc_id is not None:
+        return doc_id
+    metadata = doc.metadata or {}
+    for field in ("uuid", "id"):
+        if metadata.get(field) is not None:
+            return metadata[field]
+    return doc.page_content
+
+
+def _flatten(lists: Sequence[Sequence], key: Callable) -> Tuple[List, np.ndarray, np.ndarray]:
+    """
+    Map every item to a dense integer index.
+
+    Returns the first item seen for each index, the flat index array, and the
+    length of every input list.
+    """
+    index: dict = {}
+    firsts = []
+    flat = []
+    for items in lists:
+        for item in items:
+            i = index.setdefault(key(item), len(index))
+            if i == len(firsts):
+                firsts.append(item)
+            flat.append(i)
+    lengths = np.fromiter((len(items) for items in lists), dtype=np.int64, count=len(lists))
+    return firsts, np.array(flat, dtype=np.int64), lengths
+
+
+def _ranks(lengths: np.ndarray) -> np.ndarray:
+    """0-based rank of every flattened item within its own list"""
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(int(lengths.sum())) - starts
+
+
+def top_k_indices(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the top_k highest scores, best first. Ties keep first-seen order.
+    """
+    n = len(scores)
+    if top_k is None or top_k >= n:
+        return np.argsort(-scores, kind="stable")
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    # argpartition picks an arbitrary subset of the items tied with the k-th
+    # score, so keep all of them and let the stable sort decide
+    threshold = -np.partition(-scores, top_k - 1)[top_k - 1]
+    candidates = np.flatnonzero(scores >= threshold)
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+
+
+def rrf_scores(
+    flat: np.ndarray,
+    lengths: np.ndarray,
+    num_items: int,
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Sum of weight / (rank + k) per item over all lists, using the same
+    0-based rank as the chapter's reciprocal_rank_fusion
+    """
+    contributions = 1.0 / (_ranks(lengths) + k)
+    if weights is not None:
+        contributions *= np.repeat(np.asarray(weights, dtype=np.float64), lengths)
+    return np.bincount(flat, weights=contributions, minlength=num_items)
+
+
+def reciprocal_rank_fusion(
+    results: Sequence[Sequence[Document]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+    top_k: Optional[int] = None,
+    key: Key = document_id,
+) -> List[Document]:
+    """
+    Weighted reciprocal rank fusion of ranked document lists
+
+    Args:
+        results: one ranked list per query / retriever
+        k: the RRF constant, larger values flatten the rank differences
+        weights: optional weight per list, all 1.0 by default
+        top_k: return only this many documents
+        key: how documents are identified across lists
+    """
+    if weights is not None and len(weights) != len(results):
+        raise ValueError(f"Expected {len(results)} weights, got {len(weights)}")
+    docs, flat, lengths = _flatten(results, key)
+    scores = rrf_scores(flat, lengths, len(docs), k=k, weights=weights)
+    return [docs[i] for i in top_k_indices(scores, top_k)]
+
+
+def _normalized_scores(results: Sequence[Sequence[Tuple[Document, float]]], lengths: np.ndarray) -> np.ndarray:
+    """Min-max normalize the scores of every list to 0..1"""
+    raw = np.fromiter(
+        (score for items in results for _, score in items), dtype=np.float64, count=int(lengths.sum())
+    )
+    starts = np.cumsum(lengths) - lengths
+    nonempty = lengths > 0
+    lows = np.minimum.reduceat(raw, starts[nonempty]) if raw.size else raw
+    highs = np.maximum.reduceat(raw, starts[nonempty]) if raw.size else raw
+    low = np.repeat(lows, lengths[nonempty])
+    span = np.repeat(highs - lows, lengths[nonempty])
+    # A list whose scores are all equal contributes 1.0 per document
+    return np.divide(raw - low, span, out=np.ones_like(raw), where=span > 0)
+
+
+def _comb(
+    results: Sequence[Sequence[Tuple[Document, float]]],
+    top_k: Optional[int],
+    key: Key,
+    multiply_by_hits: bool,
+) -> List[Document]:
+    docs, flat, lengths = _flatten(results, lambda pair: key(pair[0]))
+    scores = np.bincount(flat, weights=_normalized_scores(results, lengths), minlength=len(docs))
+    if multiply_by_hits:
+        scores *= np.bincount(flat, minlength=len(docs))
+    return [docs[i][0] for i in top_k_indices(scores, top_k)]
+
+
+def comb_sum(
+    results: Sequence[Sequence[Tuple[Document, float]]],
+    top_k: Optional[int] = None,
+    key: Key = document_id,
+) -> List[Document]:
+    """
+    CombSUM: sum of the min-max normalized similarity scores per document.
+    Takes the (document, score) lists returned by similarity_search_with_score;
+    scores must be higher-is-better.
+    """
+    return _comb(results, top_k, key, multiply_by_hits=False)
+
+
+def comb_mnz(
+    results: Sequence[Sequence[Tuple[Document, float]]],
+    top_k: Optional[int] = None,
+    key: Key = document_id,
+) -> List[Document]:
+    """
+    CombMNZ: CombSUM multiplied by the number of lists that returned the document
+    """
+    return _comb(results, top_k, key, multiply_by_hits=True)
@@ -1,32 +1,35 @@
 import os
 from dotenv import load_dotenv
-from langchain.utils.math import cosine_similarity
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import chain
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from semantic_routing import Route, SemanticRouter
 
 load_dotenv()
 
 physics_template = """You are a very smart physics professor. You are great at     answering questions about physics in a concise and easy-to-understand manner.     When you don't know the answer to a question, you admit that you don't know. Here is a question: {query}"""
 math_template = """You are a very good mathematician. You are great at answering     math questions. You are so good because you are able to break down hard     problems into their component parts, answer the component parts, and then     put them together to answer the broader question. Here is a question: {query}"""
 
-# Embed prompts
+# Embed prompts and a few example questions per route. The normalized route
+# embeddings are saved under .cache/semantic_router and reused on the next run
 embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=os.getenv("GOOGLE_API_KEY"))
-prompt_templates = [physics_template, math_template]
-prompt_embeddings = embeddings.embed_documents(prompt_templates)
+routes = [
+    Route("physics", physics_template, [
+        physics_template,
+        "What is a black hole?",
+        "How does gravity bend light?",
+        "Why does ice float on water?",
+    ]),
+    Route("math", math_template, [
+        math_template,
+        "What is the derivative of x squared?",
+        "How many prime numbers are there?",
+        "Solve 3x + 5 = 20",
+    ]),
+]
+router = SemanticRouter(routes, embeddings)
 
 # Route question to prompt
-
-
-@chain
-def prompt_router(query):
-    query_embedding = embeddings.embed_query(query)
-    similarity = cosine_similarity([query_embedding], prompt_embeddings)[0]
-    most_similar = prompt_templates[similarity.argmax()]
-    print("Using MATH" if most_similar == math_template else "Using PHYSICS")
-    return PromptTemplate.from_template(most_similar)
-
+prompt_router = router.as_runnable()
 
 semantic_router = (prompt_router | ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY")) | StrOutputParser())
 
@@ -10,6 +10,7 @@ from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_postgres.vectorstores import PGVector
 from langchain_core.documents import Document
+from self_query import SelfQueryIndex
 
 load_dotenv()
 
@@ -82,11 +83,21 @@ description = "Brief summary of a movie"
 llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY"))
 retriever = SelfQueryRetriever.from_llm(llm, vectorstore, description, fields)
 
+# Reuse the retriever's LLM query constructor, but cache its translations and
+# evaluate the filters against an in-memory metadata index built from `fields`
+self_query = SelfQueryIndex(docs, fields, embeddings_model, retriever.query_constructor)
+
 # This example only specifies a filter
-print(retriever.invoke("I want to watch a movie rated higher than 8.5"))
+print(self_query.retrieve("I want to watch a movie rated higher than 8.5"))
 
 print('\n')
 
 # This example specifies multiple filters
-print(retriever.invoke(
+print(self_query.retrieve(
     "What's a highly rated (above 8.5) science fiction film?"))
+
+print('\n')
+
+# Asking again reuses the cached filter, so no LLM call is made
+print(self_query.retrieve("I want to watch a movie rated higher than 8.5"))
+print("\nSelf-query stats: ", self_query.stats())
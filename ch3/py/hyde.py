@@ -0,0 +1,135 @@
+"""
+HyDE retriever with a per-question cache and multi-passage averaging.
+
+`generate_doc | retriever` calls the LLM and the embedding model again every
+time the same question is asked. HydeRetriever keeps the generated passages
+and the resulting query vector per normalized question, so a repeat question
+goes straight to the vector search.
+
+With num_passages > 1, a single LLM call writes all the passages, separated
+by lines holding only PASSAGE_SEPARATOR. They are embedded in one call and
+their embeddings are averaged into a single query vector, which smooths out a
+single hallucinated passage. One prompt is used instead of n candidates per
+request because not every chat model supports the latter.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.vectorstores import VectorStore
+
+
+PASSAGE_SEPARATOR = "---"
+
+_SEPARATOR_LINE = re.compile(rf"^\s*{re.escape(PASSAGE_SEPARATOR)}\s*$", re.MULTILINE)
+
+
+def split_passages(text: str) -> List[str]:
+    """Split a multi-passage answer on lines holding only PASSAGE_SEPARATOR"""
+    return [p.strip() for p in _SEPARATOR_LINE.split(text) if p.strip()]
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+def truncate_tokens(text: str, max_tokens: Optional[int]) -> str:
+    """Cut text to roughly max_tokens, at four characters per token"""
+    if max_tokens is None or len(text) <= max_tokens * 4:
+        return text
+    return text[: max_tokens * 4].rsplit(" ", 1)[0]
+
+
+@dataclass
+class HydeEntry:
+    passages: List[str]
+    vector: List[float]
+
+
+class HydeRetriever:
+    def __init__(
+        self,
+        generate_doc: Runnable,
+        vectorstore: VectorStore,
+        embeddings: Embeddings,
+        k: int = 4,
+        num_passages: int = 1,
+        max_tokens: Optional[int] = 256,
+        cache_size: int = 1024,
+    ):
+        """
+        Args:
+            generate_doc: runnable taking the question and returning a
+                hypothetical passage, e.g. prompt | llm | StrOutputParser().
+                With num_passages > 1 it must return that many passages
+                separated by PASSAGE_SEPARATOR lines. Give the LLM a matching
+                output-token limit so generation stops at about max_tokens
+                per passage instead of being cut afterwards.
+            vectorstore: store searched with similarity_search_by_vector
+            embeddings: model used to embed the passages
+            k: documents to retrieve
+            num_passages: passages generated per question (in one call) and
+                averaged
+            max_tokens: passages are truncated to about this many tokens
+                before embedding
+            cache_size: number of questions to remember
+        """
+        self.generate_doc = generate_doc
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.k = k
+        self.num_passages = num_passages
+        self.max_tokens = max_tokens
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, HydeEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _generate(self, question: str) -> HydeEntry:
+        text = self.generate_doc.invoke(question)
+        passages = [text]
+        if self.num_passages > 1:
+            # Average whatever came back if the LLM wrote fewer passages
+            passages = split_passages(text)[: self.num_passages] or passages
+        passages = [truncate_tokens(p, self.max_tokens) for p in passages]
+        vectors = np.asarray(self.embeddings.embed_documents(passages), dtype=np.float32)
+        vector = vectors.mean(axis=0)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return HydeEntry(passages=passages, vector=vector.tolist())
+
+    def hypothetical(self, question: str) -> HydeEntry:
+        """
+        Return the cached passages and query vector for question, generating
+        them on the first request
+        """
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = self._generate(question)
+        with self._lock:
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def retrieve(self, question: str) -> List[Document]:
+        entry = self.hypothetical(question)
+        return self.vectorstore.similarity_search_by_vector(entry.vector, k=self.k)
+
+    def as_runnable(self) -> Runnable:
+        return RunnableLambda(self.retrieve)
@@ -0,0 +1,235 @@
+"""
+Self-query retrieval with a translation cache and a columnar metadata index.
+
+SelfQueryRetriever asks the LLM to turn every query into a structured filter
+and then lets the vector store evaluate the filter. SelfQueryIndex keeps
+the LLM translation per normalized query text, evaluates the filter itself
+against an in-memory columnar index built from the AttributeInfo list, and only
+compares the query vector with the documents that pass the filter:
+
+- numeric attributes ("integer", "float") are stored as a sorted array, so
+  range comparisons are two binary searches
+- every other attribute gets one bitmap per distinct value; list values set
+  the bit for each element
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.structured_query import Comparison, Operation, StructuredQuery
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def _is_numeric(attribute_type: str) -> bool:
+    return attribute_type.strip().lower() in ("integer", "int", "float", "number")
+
+
+class _NumericColumn:
+    def __init__(self, values: Sequence[Any]):
+        column = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+        self.present = ~np.isnan(column)
+        # NaN sorts last, so the first `count` entries of `order` are the present values
+        self.order = np.argsort(column, kind="stable")
+        self.count = int(self.present.sum())
+        self.sorted = column[self.order][: self.count]
+
+    def _select(self, start: int, stop: int) -> np.ndarray:
+        mask = np.zeros(len(self.present), dtype=bool)
+        mask[self.order[start:stop]] = True
+        return mask
+
+    def compare(self, comparator: str, value: Any) -> np.ndarray:
+        if comparator in ("in", "nin"):
+            mask = np.zeros(len(self.present), dtype=bool)
+            for v in value:
+                mask |= self.compare("eq", v)
+            return mask if comparator == "in" else self.present & ~mask
+        value = float(value)
+        left = int(np.searchsorted(self.sorted, value, side="left"))
+        right = int(np.searchsorted(self.sorted, value, side="right"))
+        if comparator == "eq":
+            return self._select(left, right)
+        if comparator == "ne":
+            return self.present & ~self._select(left, right)
+        if comparator == "gt":
+            return self._select(right, self.count)
+        if comparator == "gte":
+            return self._select(left, self.count)
+        if comparator == "lt":
+            return self._select(0, left)
+        if comparator == "lte":
+            return self._select(0, right)
+        raise ValueError(f"Unsupported comparator for a numeric attribute: {comparator}")
+
+
+class _CategoricalColumn:
+    def __init__(self, values: Sequence[Any]):
+        self.size = len(values)
+        self.present = np.zeros(self.size, dtype=bool)
+        self.bitmaps: Dict[str, np.ndarray] = {}
+        for row, value in enumerate(values):
+            if value is None:
+                continue
+            self.present[row] = True
+            for item in value if isinstance(value, (list, tuple, set)) else [value]:
+                key = str(item).lower()
+                if key not in self.bitmaps:
+                    self.bitmaps[key] = np.zeros(self.size, dtype=bool)
+                self.bitmaps[key][row] = True
+
+    def _union(self, keys) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        for key in keys:
+            bitmap = self.bitmaps.get(key)
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def compare(self, comparator: str, value: Any) -> np.ndarray:
+        if comparator in ("eq", "ne", "contain"):
+            mask = self._union([str(value).lower()])
+        elif comparator == "like":
+            needle = str(value).lower()
+            mask = self._union([key for key in self.bitmaps if needle in key])
+        elif comparator in ("in", "nin"):
+            mask = self._union([str(v).lower() for v in value])
+        else:
+            # Range comparisons on text fall back to lexicographic order
+            needle = str(value).lower()
+            ops = {"gt": str.__gt__, "gte": str.__ge__, "lt": str.__lt__, "lte": str.__le__}
+            if comparator not in ops:
+                raise ValueError(f"Unsupported comparator: {comparator}")
+            mask = self._union([key for key in self.bitmaps if ops[comparator](key, needle)])
+        if comparator in ("ne", "nin"):
+            return self.present & ~mask
+        return mask
+
+
+class MetadataIndex:
+    def __init__(self, documents: Sequence[Document], attribute_info: Sequence[Any]):
+        """
+        Args:
+            documents: the indexed documents
+            attribute_info: AttributeInfo entries (or dicts with name/type)
+                describing the filterable metadata
+        """
+        self.size = len(documents)
+        self.columns: Dict[str, Any] = {}
+        for info in attribute_info:
+            name = info["name"] if isinstance(info, dict) else info.name
+            attribute_type = info["type"] if isinstance(info, dict) else info.type
+            values = [doc.metadata.get(name) for doc in documents]
+            if _is_numeric(attribute_type):
+                self.columns[name] = _NumericColumn(values)
+            else:
+                self.columns[name] = _CategoricalColumn(values)
+
+    def mask(self, node: Any) -> np.ndarray:
+        """Boolean mask of the documents matching a structured-query filter node"""
+        if node is None:
+            return np.ones(self.size, dtype=bool)
+        if isinstance(node, Comparison):
+            column = self.columns.get(node.attribute)
+            if column is None:
+                raise KeyError(f"No index for attribute {node.attribute!r}")
+            return column.compare(getattr(node.comparator, "value", node.comparator), node.value)
+        if isinstance(node, Operation):
+            operator = getattr(node.operator, "value", node.operator)
+            masks = [self.mask(argument) for argument in node.arguments]
+            if operator == "and":
+                return np.logical_and.reduce(masks)
+            if operator == "or":
+                return np.logical_or.reduce(masks)
+            if operator == "not":
+                return ~np.logical_or.reduce(masks)
+        raise ValueError(f"Unsupported filter node: {node!r}")
+
+
+class SelfQueryIndex:
+    def __init__(
+        self,
+        documents: Sequence[Document],
+        attribute_info: Sequence[Any],
+        embeddings: Embeddings,
+        query_constructor: Runnable,
+        k: int = 4,
+        cache_size: int = 1024,
+    ):
+        """
+        Args:
+            documents: documents to search; embedded once, in one call
+            attribute_info: AttributeInfo list describing the metadata
+            embeddings: model for documents and queries
+            query_constructor: runnable turning {"query": ...} into a
+                StructuredQuery, e.g. SelfQueryRetriever.from_llm(...).query_constructor
+            k: default number of documents to return
+            cache_size: number of query translations to remember
+        """
+        self.documents = list(documents)
+        self.index = MetadataIndex(self.documents, attribute_info)
+        self.embeddings = embeddings
+        self.query_constructor = query_constructor
+        self.k = k
+        self.cache_size = cache_size
+        vectors = np.asarray(embeddings.embed_documents([d.page_content for d in self.documents]), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self.vector_comparisons = 0
+        self._translations: "OrderedDict[str, StructuredQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def translate(self, query: str) -> StructuredQuery:
+        """The structured query for query, from the cache when it was seen before"""
+        key = normalize_query(query)
+        with self._lock:
+            structured = self._translations.get(key)
+            if structured is not None:
+                self._translations.move_to_end(key)
+                self.cache_hits += 1
+                return structured
+            self.llm_calls += 1
+        structured = self.query_constructor.invoke({"query": query})
+        with self._lock:
+            self._translations[key] = structured
+            if len(self._translations) > self.cache_size:
+                self._translations.popitem(last=False)
+        return structured
+
+    def search(self, structured: StructuredQuery, k: Optional[int] = None) -> List[Document]:
+        k = structured.limit or k or self.k
+        candidates = np.flatnonzero(self.index.mask(structured.filter))
+        if not structured.query.strip() or len(candidates) <= 1:
+            # Nothing to rank by; the filter alone decides
+            return [self.documents[i] for i in candidates[:k]]
+        query_vector = np.asarray(self.embeddings.embed_query(structured.query), dtype=np.float32)
+        self.vector_comparisons += len(candidates)
+        scores = self.vectors[candidates] @ query_vector
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            top = np.argsort(-scores, kind="stable")
+        return [self.documents[candidates[i]] for i in top]
+
+    def retrieve(self, query: str) -> List[Document]:
+        return self.search(self.translate(query))
+
+    def as_runnable(self) -> Runnable:
+        return RunnableLambda(self.retrieve)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "llm_calls": self.llm_calls,
+            "cache_hits": self.cache_hits,
+            "vector_comparisons": self.vector_comparisons,
+        }
@@ -0,0 +1,138 @@
+"""
+Semantic routing with a precomputed, normalized route-embedding matrix.
+
+Each route has a prompt template and any number of exemplar utterances. All
+exemplars are embedded once, in one batched call, L2-normalized and stored as
+a single float32 matrix on disk, keyed by a fingerprint of the embedding model
+and the exemplars. Routing a query is then one matrix-vector product plus a
+per-route max, which stays well under a millisecond for hundreds of routes
+with several exemplars each.
+
+Query embeddings are kept in an LRU cache and every route's PromptTemplate is
+compiled once.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
+
+DEFAULT_ROUTER_CACHE_DIR = os.environ.get("ROUTER_CACHE_DIR", ".cache/semantic_router")
+
+
+@dataclass
+class Route:
+    name: str
+    template: str
+    # Example questions for this route; the template itself is used if empty
+    utterances: List[str] = field(default_factory=list)
+
+    @property
+    def exemplars(self) -> List[str]:
+        return self.utterances or [self.template]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class SemanticRouter:
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        embeddings: Embeddings,
+        cache_dir: str = DEFAULT_ROUTER_CACHE_DIR,
+        query_cache_size: int = 1024,
+    ):
+        """
+        Args:
+            routes: the routes to choose from, names must be unique
+            embeddings: model used for exemplars and queries
+            cache_dir: where the route-embedding matrix is persisted
+            query_cache_size: number of query embeddings to remember
+        """
+        names = [route.name for route in routes]
+        if len(set(names)) != len(names):
+            raise ValueError("Route names must be unique")
+        if not routes:
+            raise ValueError("At least one route is required")
+        self.routes = list(routes)
+        self.embeddings = embeddings
+        self.cache_dir = cache_dir
+        self.query_cache_size = query_cache_size
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+        # Exemplar rows are grouped by route; offsets mark where each route starts
+        counts = np.array([len(route.exemplars) for route in self.routes])
+        self._offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self.matrix = self._load_or_build()
+
+    def _fingerprint(self) -> str:
+        model = getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
+        payload = json.dumps([model, [[r.name, r.exemplars] for r in self.routes]])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _load_or_build(self) -> np.ndarray:
+        path = os.path.join(self.cache_dir, f"{self._fingerprint()}.npy")
+        if os.path.exists(path):
+            return np.load(path)
+        exemplars = [text for route in self.routes for text in route.exemplars]
+        matrix = _normalize_rows(np.asarray(self.embeddings.embed_documents(exemplars), dtype=np.float32))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, matrix)
+        os.replace(tmp_path, path)
+        return matrix
+
+    def embed_query(self, query: str) -> np.ndarray:
+        key = query.strip()
+        with self._lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                return vector
+        vector = _normalize_rows(np.asarray(self.embeddings.embed_query(key), dtype=np.float32))
+        with self._lock:
+            self._query_cache[key] = vector
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def scores(self, query: str) -> np.ndarray:
+        """Best cosine similarity between the query and each route's exemplars"""
+        return np.maximum.reduceat(self.matrix @ self.embed_query(query), self._offsets)
+
+    def route(self, query: str) -> Tuple[Route, float]:
+        scores = self.scores(query)
+        best = int(scores.argmax())
+        return self.routes[best], float(scores[best])
+
+    def template(self, route: Route) -> PromptTemplate:
+        prompt = self._templates.get(route.name)
+        if prompt is None:
+            prompt = self._templates[route.name] = PromptTemplate.from_template(route.template)
+        return prompt
+
+    def as_runnable(self) -> Runnable:
+        """
+        Runnable returning the chosen route's prompt, which LangChain then
+        invokes with the same query: router.as_runnable() | llm
+        """
+
+        def prompt_router(query: str) -> PromptTemplate:
+            route, _ = self.route(query)
+            print(f"Using {route.name.upper()}")
+            return self.template(route)
+
+        return RunnableLambda(prompt_router)
@@ -0,0 +1,39 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from fusion import reciprocal_rank_fusion, top_k_indices
+
+
+def test_top_k_keeps_first_seen_order_among_ties():
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 2.0, 2.0, 3.0, 2.0])
+    for top_k in range(len(scores) + 1):
+        expected = np.argsort(-scores, kind="stable")[:top_k]
+        assert top_k_indices(scores, top_k).tolist() == expected.tolist()
+
+
+def test_top_k_matches_stable_sort_on_random_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        scores = rng.integers(0, 4, size=int(rng.integers(1, 50))).astype(np.float64)
+        top_k = int(rng.integers(1, len(scores) + 1))
+        expected = np.argsort(-scores, kind="stable")[:top_k]
+        assert top_k_indices(scores, top_k).tolist() == expected.tolist()
+
+
+def test_rrf_top_k_breaks_ties_by_first_appearance():
+    docs = [Document(page_content=name, id=name) for name in "abcd"]
+    # Every document gets the same fused score, so the cut falls inside the tie
+    # and the order the documents were first seen in decides
+    results = [[docs[0], docs[1]], [docs[2], docs[3]], [docs[1], docs[0]], [docs[3], docs[2]]]
+    fused = reciprocal_rank_fusion(results, top_k=3)
+    assert [doc.id for doc in fused] == ["a", "b", "c"]
+
+
+def test_rrf_keyed_on_content_merges_copies_stored_under_different_ids():
+    a1, a2 = Document(page_content="a", id="1"), Document(page_content="a", id="2")
+    b = Document(page_content="b", id="3")
+    results = [[a1, b], [b, a2], [a2, b]]
+    by_id = reciprocal_rank_fusion(results)
+    by_content = reciprocal_rank_fusion(results, key=lambda doc: doc.page_content)
+    assert [doc.page_content for doc in by_id] == ["b", "a", "a"]
+    assert [doc.page_content for doc in by_content] == ["a", "b"]
@@ -0,0 +1,28 @@
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.runnables import RunnableLambda
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from hyde import HydeRetriever, split_passages
+
+
+def test_split_passages_on_separator_lines():
+    text = "First passage.\n---\nSecond passage,\nover two lines.\n\n ---  \nThird."
+    assert split_passages(text) == ["First passage.", "Second passage,\nover two lines.", "Third."]
+
+
+def test_passages_come_from_one_call_and_repeat_questions_skip_it():
+    calls = []
+
+    def generate(question):
+        calls.append(question)
+        return "Plato taught Aristotle.\n---\nSocrates taught Plato.\n---\nZeno of Elea."
+
+    embeddings = DeterministicFakeEmbedding(size=8)
+    store = InMemoryVectorStore.from_texts(["Plato", "Zeno"], embeddings)
+    hyde = HydeRetriever(RunnableLambda(generate), store, embeddings, k=1, num_passages=2)
+
+    entry = hyde.hypothetical("Who taught Plato?")
+    assert entry.passages == ["Plato taught Aristotle.", "Socrates taught Plato."]
+    assert len(hyde.retrieve("who taught plato")) == 1
+    assert len(calls) == 1
+    assert (hyde.hits, hyde.misses) == (1, 1)
@@ -1,7 +1,7 @@
 from typing import Annotated, Literal, TypedDict
 
 from langchain_core.documents import Document
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.vectorstores.in_memory import InMemoryVectorStore
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 import os
@@ -75,14 +75,75 @@ Output only the domain name."""
 )
 
 
+DOMAINS = ("records", "insurance")
+# A query is routed without the LLM only when its nearest examples all agree,
+# the nearest one is this similar, and it beats every example of the other
+# domain by this margin
+MIN_SIMILARITY = 0.8
+MIN_MARGIN = 0.05
+
+# Example queries per domain, embedded once
+router_examples = InMemoryVectorStore.from_documents(
+    [
+        Document(page_content=query, metadata={"domain": domain})
+        for domain, queries in {
+            "records": [
+                "What was my diagnosis last year?",
+                "Which medication was I prescribed?",
+                "What surgery did I have in 2015?",
+                "내 진단 결과가 뭐였지?",
+            ],
+            "insurance": [
+                "Does my policy cover this treatment?",
+                "How do I file an insurance claim?",
+                "What is my deductible?",
+                "보험금 청구는 어떻게 하나요?",
+            ],
+        }.items()
+        for query in queries
+    ],
+    embeddings,
+)
+
+
+def local_domain(query: str, k: int = 3):
+    results = router_examples.similarity_search_with_score(query, k=2 * k)
+    nearest = results[:k]
+    domains = {doc.metadata["domain"] for doc, _ in nearest}
+    if len(domains) != 1 or nearest[0][1] < MIN_SIMILARITY:
+        return None
+    domain = domains.pop()
+    runner_up = max(
+        (score for doc, score in results if doc.metadata["domain"] != domain), default=0.0
+    )
+    return domain if nearest[0][1] - runner_up >= MIN_MARGIN else None
+
+
+def parse_domain(answer: str):
+    """The domain named in the LLM's answer ("Records." -> "records"), or None"""
+    answer = answer.strip().strip(".'\"`*").lower()
+    return answer if answer in DOMAINS else None
+
+
 def router_node(state: State) -> State:
     user_message = HumanMessage(state["user_query"])
-    messages = [router_prompt, *state["messages"], user_message]
-    res = model_low_temp.invoke(messages)
+    domain = local_domain(state["user_query"])
+    if domain is None:
+        messages = [router_prompt, *state["messages"], user_message]
+        answer = model_low_temp.invoke(messages).content
+        domain = parse_domain(answer)
+        if domain is None:
+            # Never learn from an answer that is not a known domain
+            domain = answer.strip()
+        else:
+            # Remember the LLM's decision so similar queries are routed locally next time
+            router_examples.add_documents(
+                [Document(page_content=state["user_query"], metadata={"domain": domain})]
+            )
     return {
-        "domain": res.content,
+        "domain": domain,
         # update conversation history
-        "messages": [user_message, res],
+        "messages": [user_message, AIMessage(domain)],
     }
 
 
@@ -0,0 +1,56 @@
+"""Report the import cost of the LangGraph server graphs.
+
+Runs `python -X importtime` in a fresh interpreter for each graph module, so the
+numbers match what a cold server worker pays before it can serve a request:
+
+    python benchmarks/import_time.py --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+GRAPH_MODULES = ["retrieval_graph.graph", "ingestion_graph.graph"]
+
+
+def import_times(module: str) -> list[tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, name) for every module imported by `module`."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("modules", nargs="*", default=GRAPH_MODULES)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        rows = import_times(module)
+        total = next(cumulative for _, cumulative, name in rows if name == module)
+        print(f"{module}: {total / 1e3:.1f} ms cumulative, {len(rows)} modules")
+        top_level = sorted(
+            (row for row in rows if "." not in row[2]), key=lambda row: row[1], reverse=True
+        )
+        for _, cumulative, name in top_level[: args.top]:
+            print(f"  {cumulative / 1e3:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure the per-call cost of `reduce_docs` as the documents state grows.
+
+Each step adds a small batch to an accumulated state of up to 100k documents.
+With a `DocumentCollection` state each call only copies the list and its id
+index, which is far cheaper than rebuilding the index from the documents'
+metadata on every call, as a plain list state does and as it used to be:
+
+    python benchmarks/reduce_docs.py --state-size 100000 --batch-size 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from langchain_core.documents import Document  # noqa: E402
+
+from shared.state import reduce_docs  # noqa: E402
+
+
+def make_batch(start: int, size: int) -> list[Document]:
+    return [Document(page_content=f"document {i}") for i in range(start, start + size)]
+
+
+def measure(state_size: int, batch_size: int, checkpoints: list[int], indexed: bool) -> None:
+    state = reduce_docs([], make_batch(0, batch_size))
+    total = batch_size
+    for checkpoint in checkpoints:
+        # Grow the state cheaply to the next checkpoint size.
+        state = reduce_docs(state, make_batch(total, checkpoint - total))
+        total = checkpoint
+        batch = make_batch(total, batch_size)
+        existing = state if indexed else list(state)
+        started = time.perf_counter()
+        state = reduce_docs(existing, batch)
+        elapsed = time.perf_counter() - started
+        total += batch_size
+        label = "indexed" if indexed else "plain list"
+        print(f"{label:<12}{checkpoint:>10}{elapsed * 1e3:>12.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--state-size", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    checkpoints = [
+        size for size in (1_000, 10_000, 50_000, 100_000, 500_000) if size <= args.state_size
+    ]
+    print(f"{'state':<12}{'docs':>10}{'ms/call':>12}")
+    for indexed in (False, True):
+        measure(args.state_size, args.batch_size, checkpoints, indexed)
+
+
+if __name__ == "__main__":
+    main()
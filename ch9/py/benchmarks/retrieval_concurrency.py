@@ -0,0 +1,54 @@
+"""Measure retrieval graph throughput with N simultaneous threads.
+
+The chat model, hub prompt and vector store are replaced with local stubs that
+sleep for a fixed latency, so the numbers only reflect how well the graph
+overlaps I/O on the event loop. Compare the async stubs against the blocking
+ones (which mimic calling `.invoke` from inside an async node):
+
+    python benchmarks/retrieval_concurrency.py --threads 1 8 32
+"""
+
+import argparse
+import asyncio
+import time
+
+from stubs import install_stubs, retrieval_graph
+
+
+async def run(threads: int) -> float:
+    """Run `threads` graph invocations concurrently and return the wall time."""
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            retrieval_graph.graph.ainvoke(
+                {"query": f"question {i}", "messages": []},
+                {"configurable": {"thread_id": str(i)}},
+            )
+            for i in range(threads)
+        )
+    )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--model-latency", type=float, default=0.2)
+    parser.add_argument("--store-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'threads':>8}{'seconds':>10}{'runs/s':>10}")
+    for mode in ("blocking", "async"):
+        install_stubs(
+            router_latency=args.model_latency,
+            model_latency=args.model_latency,
+            store_latency=args.store_latency,
+            blocking=mode == "blocking",
+        )
+        for threads in args.threads:
+            elapsed = asyncio.run(run(threads))
+            print(f"{mode:<10}{threads:>8}{elapsed:>10.2f}{threads / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
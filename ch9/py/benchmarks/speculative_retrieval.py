@@ -0,0 +1,51 @@
+"""Compare time to first token with and without speculative retrieval.
+
+Routing, retrieval and generation are stubbed with fixed latencies. Time to
+first token is measured as the time until answer generation starts. With
+speculative retrieval it should drop by about min(router, store) latency for
+retrieve-routed queries:
+
+    python benchmarks/speculative_retrieval.py --router-latency 0.8 --store-latency 0.3
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from stubs import install_stubs, retrieval_graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--router-latency", type=float, default=0.8)
+    parser.add_argument("--store-latency", type=float, default=0.3)
+    parser.add_argument("--model-latency", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14}{'ttft (s)':>10}")
+    for speculative in (False, True):
+        samples = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            first_token: list[float] = []
+            install_stubs(
+                router_latency=args.router_latency,
+                model_latency=args.model_latency,
+                store_latency=args.store_latency,
+                on_generate=lambda: first_token.append(time.perf_counter() - started),
+            )
+            asyncio.run(
+                retrieval_graph.graph.ainvoke(
+                    {"query": "question", "messages": []},
+                    {"configurable": {"speculative_retrieval": speculative}},
+                )
+            )
+            samples.append(first_token[0])
+        label = "speculative" if speculative else "serial"
+        print(f"{label:<14}{statistics.median(samples):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
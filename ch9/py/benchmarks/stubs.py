@@ -0,0 +1,109 @@
+"""Local stand-ins for the retrieval graph's chat model, prompt and vector store.
+
+Each stub sleeps for a fixed latency, so benchmarks measure how the graph
+schedules work rather than provider speed. `blocking=True` makes the stubs
+call `time.sleep`, mimicking a synchronous `.invoke` inside an async node.
+"""
+
+import asyncio
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.prompts import ChatPromptTemplate  # noqa: E402
+
+import retrieval_graph.graph as retrieval_graph  # noqa: E402
+
+
+async def _wait(latency: float, blocking: bool) -> None:
+    if blocking:
+        time.sleep(latency)
+    else:
+        await asyncio.sleep(latency)
+
+
+class StubStructuredModel:
+    def __init__(self, latency: float, blocking: bool, route: str) -> None:
+        self.latency = latency
+        self.blocking = blocking
+        self.route = route
+
+    async def ainvoke(self, _input):
+        await _wait(self.latency, self.blocking)
+        return retrieval_graph.Schema(route=self.route, direct_answer="stub direct answer")
+
+
+class StubChatModel:
+    def __init__(
+        self,
+        router_latency: float,
+        latency: float,
+        blocking: bool,
+        route: str,
+        on_generate: Optional[Callable[[], None]],
+    ) -> None:
+        self.router_latency = router_latency
+        self.latency = latency
+        self.blocking = blocking
+        self.route = route
+        self.on_generate = on_generate
+
+    def with_structured_output(self, _schema):
+        return StubStructuredModel(self.router_latency, self.blocking, self.route)
+
+    async def ainvoke(self, _messages):
+        if self.on_generate is not None:
+            self.on_generate()
+        await _wait(self.latency, self.blocking)
+        return AIMessage(content="stub answer")
+
+
+class StubRetriever:
+    def __init__(self, latency: float, blocking: bool) -> None:
+        self.latency = latency
+        self.blocking = blocking
+
+    async def ainvoke(self, query: str):
+        await _wait(self.latency, self.blocking)
+        return [Document(page_content=f"stub document for {query}")]
+
+
+def install_stubs(
+    *,
+    router_latency: float,
+    model_latency: float,
+    store_latency: float,
+    blocking: bool = False,
+    route: str = "retrieve",
+    on_generate: Optional[Callable[[], None]] = None,
+) -> None:
+    """Point the retrieval graph's model, prompt and store lookups at local stubs.
+
+    Args:
+        router_latency: Seconds taken by the structured-output routing call.
+        model_latency: Seconds taken by the answer generation call.
+        store_latency: Seconds taken by a vector store query.
+        blocking: Sleep with `time.sleep` instead of `asyncio.sleep`.
+        route: Route returned by the stub router, "retrieve" or "direct".
+        on_generate: Called when answer generation starts, e.g. to record
+            time to first token.
+    """
+    prompt = ChatPromptTemplate.from_messages(
+        [("human", "Context: {context}\nQuestion: {question}")]
+    )
+
+    @contextmanager
+    def stub_make_retriever(_config):
+        yield StubRetriever(store_latency, blocking)
+
+    model = StubChatModel(router_latency, model_latency, blocking, route, on_generate)
+    retrieval_graph.load_chat_model = lambda _name: model
+    retrieval_graph.load_structured_model = lambda _name, schema: model.with_structured_output(schema)
+    retrieval_graph.make_retriever = stub_make_retriever
+    retrieval_graph.get_prompt = lambda _name: prompt
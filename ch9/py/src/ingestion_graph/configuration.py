@@ -8,6 +8,7 @@ from langchain_core.runnables import RunnableConfig, ensure_config
 
 
 DEFAULT_DOCS_FILE = "src/docSplits.json"
+DEFAULT_LOAD_MANIFEST = ".cache/load_manifest.json"
 
 
 @dataclass(kw_only=True)
@@ -36,12 +37,12 @@ class IndexConfiguration:
     )
 
     retriever_provider: Annotated[
-        Literal["supabase", "chroma"],
+        Literal["supabase", "chroma", "local"],
         {"__template_metadata__": {"kind": "retriever"}},
     ] = field(
         default="chroma",
         metadata={
-            "description": "The vector store provider to use for retrieval. Options are 'supabase', or 'chroma'."
+            "description": "The vector store provider to use for retrieval. Options are 'supabase', 'chroma', or 'local' (an in-process store persisted under LOCAL_VECTOR_STORE_DIR)."
         },
     )
 
@@ -52,6 +53,76 @@ class IndexConfiguration:
         },
     )
 
+    prefilter_selectivity: float = field(
+        default=0.05,
+        metadata={
+            "description": "Chroma only: when at most this fraction of the collection matches the search filter, the matching vectors are fetched and scored exactly instead of filtering inside the ANN search. Broader filters over-fetch unfiltered neighbours and drop non-matching ones client-side."
+        },
+    )
+
+    streaming: bool = field(
+        default=False,
+        metadata={
+            "description": "Parse docs_file incrementally and embed and upsert it in batches instead of loading it all at once. Accepts a JSON array or a .jsonl file."
+        },
+    )
+
+    batch_size: int = field(
+        default=64,
+        metadata={
+            "description": "Number of documents embedded and upserted per batch in streaming mode."
+        },
+    )
+
+    max_concurrency: int = field(
+        default=4,
+        metadata={
+            "description": "Maximum number of batches in flight at once in streaming mode."
+        },
+    )
+
+    indexing_mode: Literal["append", "incremental", "full"] = field(
+        default="append",
+        metadata={
+            "description": "How documents are written. 'append' adds every document. 'incremental' and 'full' use a record manager to write only new or changed documents; 'incremental' deletes stale versions per source, 'full' also deletes sources missing from this run."
+        },
+    )
+
+    record_manager_url: str = field(
+        default="sqlite:///.cache/record_manager.sqlite3",
+        metadata={
+            "description": "SQLAlchemy URL of the record manager database used by the incremental and full indexing modes."
+        },
+    )
+
+    source_id_key: str = field(
+        default="source",
+        metadata={
+            "description": "Metadata key identifying the source a document was split from. Used to delete stale versions in incremental mode; documents without it are treated as their own source."
+        },
+    )
+
+    source_paths: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Files, directories or glob patterns to load (.txt, .md, .rst, .pdf, .html) instead of docs_file. Files are parsed in a process pool and unchanged files are skipped using load_manifest."
+        },
+    )
+
+    load_workers: Optional[int] = field(
+        default=None,
+        metadata={
+            "description": "Number of worker processes parsing source_paths. Defaults to the number of CPUs."
+        },
+    )
+
+    load_manifest: str = field(
+        default=DEFAULT_LOAD_MANIFEST,
+        metadata={
+            "description": "Path of the manifest recording the mtime, size and hash of every loaded file, used to skip unchanged files on later runs."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls: Type[T], config: Optional[RunnableConfig] = None
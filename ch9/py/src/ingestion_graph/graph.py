@@ -1,20 +1,73 @@
+import asyncio
 import json
 from typing import Optional
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
 from ingestion_graph.configuration import IndexConfiguration
+from ingestion_graph.indexing import index_documents
+from ingestion_graph.loading import ParallelDirectoryLoader
 from ingestion_graph.state import IndexState, reduce_docs
+from ingestion_graph.streaming import iter_serialized_docs, stream_ingest
 
 from shared.retrieval import make_retriever
 
 
+async def ingest_sources(config: RunnableConfig, configuration: IndexConfiguration) -> None:
+    """Load source_paths in a process pool and store documents as they are parsed."""
+    loader = ParallelDirectoryLoader(
+        configuration.source_paths,
+        max_workers=configuration.load_workers,
+        # Full indexing deletes every source missing from the run, so it must see all files.
+        manifest_path=None if configuration.indexing_mode == "full" else configuration.load_manifest,
+    )
+    with make_retriever(config) as retriever:
+        if configuration.indexing_mode != "append":
+            await asyncio.to_thread(
+                index_documents, retriever.vectorstore, loader.lazy_load(), configuration
+            )
+        else:
+            await stream_ingest(
+                retriever.aadd_documents,
+                loader.alazy_load(),
+                batch_size=configuration.batch_size,
+                max_concurrency=configuration.max_concurrency,
+            )
+    # Only mark files as loaded once their documents are stored.
+    loader.commit()
+
+
 async def ingest_docs(state: IndexState, config: Optional[RunnableConfig] = None) -> dict[str, str]:
     if not config:
         raise ValueError("Configuration required to run index_docs.")
 
     configuration = IndexConfiguration.from_runnable_config(config)
     docs = state["docs"]
+    if configuration.source_paths and not docs:
+        await ingest_sources(config, configuration)
+        return {"docs": "delete"}
+
+    if configuration.indexing_mode != "append":
+        with make_retriever(config) as retriever:
+            # The record manager and index() are synchronous; run them off the event loop.
+            await asyncio.to_thread(
+                index_documents,
+                retriever.vectorstore,
+                docs or iter_serialized_docs(configuration.docs_file),
+                configuration,
+            )
+        return {"docs": "delete"}
+
+    if configuration.streaming:
+        with make_retriever(config) as retriever:
+            await stream_ingest(
+                retriever.aadd_documents,
+                docs or iter_serialized_docs(configuration.docs_file),
+                batch_size=configuration.batch_size,
+                max_concurrency=configuration.max_concurrency,
+            )
+        return {"docs": "delete"}
+
     if not docs:
         with open(configuration.docs_file, encoding="utf-8") as file_content:
             serialized_docs = json.loads(file_content.read())
@@ -22,7 +75,7 @@ async def ingest_docs(state: IndexState, config: Optional[RunnableConfig] = None
     else:
         docs = reduce_docs([], docs)
 
-    with make_retriever(configuration) as retriever:
+    with make_retriever(config) as retriever:
         await retriever.aadd_documents(docs)
 
     return {"docs": "delete"}
@@ -0,0 +1,93 @@
+"""Incremental indexing backed by a local SQLite record manager."""
+
+import os
+from functools import cache
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from ingestion_graph.configuration import IndexConfiguration
+from ingestion_graph.streaming import _batched
+from shared.state import reduce_docs
+
+if TYPE_CHECKING:
+    from langchain.indexes import SQLRecordManager
+    from langchain_core.indexing import IndexingResult
+
+
+@cache
+def get_record_manager(db_url: str, namespace: str) -> "SQLRecordManager":
+    """Return the record manager for `namespace`, creating its schema on first use."""
+    # SQLAlchemy is only needed by the record-manager indexing modes.
+    from langchain.indexes import SQLRecordManager
+
+    if db_url.startswith("sqlite:///"):
+        directory = os.path.dirname(os.path.abspath(db_url[len("sqlite:///"):]))
+        os.makedirs(directory, exist_ok=True)
+    record_manager = SQLRecordManager(namespace, db_url=db_url)
+    record_manager.create_schema()
+    return record_manager
+
+
+def _document_uuid(doc: Document) -> str:
+    """Key records by the uuid `reduce_docs` assigns, i.e. the content hash."""
+    return doc.metadata["uuid"]
+
+
+def _iter_documents(
+    items: Iterable[Any], batch_size: int, source_id_key: str
+) -> Iterator[Document]:
+    """Convert serialized items into uuid-tagged documents, dropping repeats.
+
+    Documents without a `source_id_key` value (plain strings, for instance) are
+    treated as their own source, keyed by their uuid. Incremental cleanup
+    needs a source id on every document; for these it cannot tell an edited
+    document from a new one, so their old versions are only removed by a
+    "full" run.
+    """
+    seen_ids: set[str] = set()
+    for batch in _batched(items, batch_size):
+        for doc in reduce_docs([], batch):
+            doc_id = doc.metadata["uuid"]
+            if doc_id in seen_ids:
+                continue
+            seen_ids.add(doc_id)
+            if not doc.metadata.get(source_id_key):
+                doc = doc.model_copy(
+                    update={"metadata": {**doc.metadata, source_id_key: doc_id}}
+                )
+            yield doc
+
+
+def index_documents(
+    vectorstore: VectorStore,
+    items: Iterable[Any],
+    configuration: IndexConfiguration,
+) -> "IndexingResult":
+    """Write only new or changed documents and delete stale ones.
+
+    Args:
+        vectorstore (VectorStore): The store backing the configured retriever.
+        items (Iterable[Any]): Documents, dicts or strings accepted by `reduce_docs`.
+        configuration (IndexConfiguration): Supplies the indexing mode, the
+            record manager URL, the source id key and the batch size.
+
+    Returns:
+        IndexingResult: Counts of added, updated, skipped and deleted documents.
+    """
+    from langchain.indexes import index
+
+    record_manager = get_record_manager(
+        configuration.record_manager_url,
+        f"{configuration.retriever_provider}/documents",
+    )
+    return index(
+        _iter_documents(items, configuration.batch_size, configuration.source_id_key),
+        record_manager,
+        vectorstore,
+        cleanup=configuration.indexing_mode,
+        source_id_key=configuration.source_id_key,
+        batch_size=configuration.batch_size,
+        key_encoder=_document_uuid,
+    )
@@ -0,0 +1,221 @@
+"""Parallel multi-format loading of directories and glob patterns.
+
+Files are dispatched by extension to loaders running in a process pool, so
+CPU-bound parsing (PDF in particular) uses every core, and documents are
+yielded file by file as workers finish instead of after the whole drop is
+parsed. A manifest of (mtime, size, sha256) per file lets repeated runs skip
+files that have not changed: the stat check avoids reading the file at all,
+and the hash check catches files that were touched but not modified.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+DEFAULT_MANIFEST_PATH = ".cache/load_manifest.json"
+# Forking a process that already runs threads (the LangGraph server, an event
+# loop's executor) can deadlock the children on locks held at fork time.
+DEFAULT_START_METHOD = "spawn"
+
+
+def _load_text(path: str) -> list[Document]:
+    from langchain_community.document_loaders import TextLoader
+
+    return TextLoader(path, encoding="utf-8").load()
+
+
+def _load_pdf(path: str) -> list[Document]:
+    from langchain_community.document_loaders import PyPDFLoader
+
+    return PyPDFLoader(path).load()
+
+
+def _load_html(path: str) -> list[Document]:
+    from langchain_community.document_loaders import BSHTMLLoader
+
+    return BSHTMLLoader(path, open_encoding="utf-8").load()
+
+
+# Loader per file extension. Loaders run in worker processes, so they must be
+# module-level functions.
+LOADERS: dict[str, Callable[[str], list[Document]]] = {
+    ".txt": _load_text,
+    ".md": _load_text,
+    ".rst": _load_text,
+    ".pdf": _load_pdf,
+    ".html": _load_html,
+    ".htm": _load_html,
+}
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_file(path: str, known_hash: str | None) -> tuple[str, list[Document] | None]:
+    """Worker entry point: hash the file and parse it unless the hash is unchanged."""
+    file_hash = _file_hash(path)
+    if file_hash == known_hash:
+        return file_hash, None
+    loader = LOADERS[os.path.splitext(path)[1].lower()]
+    return file_hash, loader(path)
+
+
+class LoadManifest:
+    """Per-file (mtime, size, sha256) records from the last successful load."""
+
+    def __init__(self, path: str | None = DEFAULT_MANIFEST_PATH) -> None:
+        """Read the manifest at `path`, if there is one; None keeps it in memory only."""
+        self.path = path
+        self._entries: dict[str, dict] = {}
+        self._pending: dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def check(self, path: str) -> tuple[bool, str | None]:
+        """Return (unchanged_by_stat, last_known_hash) for `path`."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return False, None
+        stat = os.stat(path)
+        unchanged = entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+        return unchanged, entry["sha256"]
+
+    def record(self, path: str, file_hash: str) -> None:
+        """Remember the current stat and hash of `path` until the next commit."""
+        stat = os.stat(path)
+        self._pending[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_hash}
+
+    def commit(self) -> None:
+        """Persist the files recorded since the last commit.
+
+        Call this once their documents are safely stored, so a failed ingestion
+        run reloads them next time.
+        """
+        self._entries.update(self._pending)
+        self._pending.clear()
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+
+def expand_paths(paths: Iterable[str]) -> list[str]:
+    """Expand files, directories (recursively) and glob patterns to supported files."""
+    found: dict[str, None] = {}
+    for pattern in paths:
+        if os.path.isdir(pattern):
+            candidates = glob.iglob(os.path.join(pattern, "**", "*"), recursive=True)
+        else:
+            candidates = glob.iglob(pattern, recursive=True)
+        for candidate in candidates:
+            if os.path.isfile(candidate) and os.path.splitext(candidate)[1].lower() in LOADERS:
+                found[os.path.abspath(candidate)] = None
+    return sorted(found)
+
+
+class ParallelDirectoryLoader(BaseLoader):
+    """Load files of several formats in a process pool and stream their documents.
+
+    Args:
+        paths: Files, directories or glob patterns (``**`` is recursive).
+        max_workers: Worker processes; defaults to the number of CPUs.
+        manifest_path: Where to keep the change manifest. None loads every file
+            every time.
+        start_method: How worker processes are started ("spawn", "forkserver"
+            or "fork"). Spawn is the default because forking a threaded
+            process is unsafe.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        *,
+        max_workers: int | None = None,
+        manifest_path: str | None = DEFAULT_MANIFEST_PATH,
+        start_method: str = DEFAULT_START_METHOD,
+    ) -> None:
+        """Resolve the worker count and load the manifest; nothing is read yet."""
+        self.paths = list(paths)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.manifest = LoadManifest(manifest_path)
+        self.mp_context = multiprocessing.get_context(start_method)
+        self.skipped_files = 0
+        self.loaded_files = 0
+
+    def _to_load(self) -> Iterator[tuple[str, str | None]]:
+        use_manifest = self.manifest.path is not None
+        for path in expand_paths(self.paths):
+            unchanged, known_hash = self.manifest.check(path) if use_manifest else (False, None)
+            if unchanged:
+                self.skipped_files += 1
+                continue
+            yield path, known_hash
+
+    def _collect(self, path: str, result: tuple[str, list[Document] | None]) -> list[Document]:
+        file_hash, docs = result
+        self.manifest.record(path, file_hash)
+        if docs is None:
+            self.skipped_files += 1
+            return []
+        self.loaded_files += 1
+        return docs
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Yield documents file by file in completion order."""
+        window = self.max_workers * 2
+        with ProcessPoolExecutor(self.max_workers, mp_context=self.mp_context) as pool:
+            pending: dict[Future, str] = {}
+            for path, known_hash in self._to_load():
+                pending[pool.submit(_load_file, path, known_hash)] = path
+                if len(pending) < window:
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from self._collect(pending.pop(future), future.result())
+            for future in list(pending):
+                yield from self._collect(pending.pop(future), future.result())
+
+    async def alazy_load(self) -> AsyncIterator[Document]:
+        """Async variant of `lazy_load` that never blocks the event loop."""
+        loop = asyncio.get_running_loop()
+        window = self.max_workers * 2
+        with ProcessPoolExecutor(self.max_workers, mp_context=self.mp_context) as pool:
+            pending: dict[asyncio.Future, str] = {}
+
+            async def drain() -> AsyncIterator[Document]:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    for doc in self._collect(pending.pop(future), future.result()):
+                        yield doc
+
+            for path, known_hash in self._to_load():
+                pending[loop.run_in_executor(pool, _load_file, path, known_hash)] = path
+                if len(pending) >= window:
+                    async for doc in drain():
+                        yield doc
+            while pending:
+                async for doc in drain():
+                    yield doc
+
+    def commit(self) -> None:
+        """Record the files loaded so far in the manifest so later runs skip them."""
+        self.manifest.commit()
@@ -0,0 +1,201 @@
+"""Streaming, batched ingestion for large document files."""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Union
+
+from langchain_core.documents import Document
+
+from shared.state import reduce_docs
+
+logger = logging.getLogger(__name__)
+
+_READ_SIZE = 1 << 16
+DEFAULT_DEDUPE_WINDOW = 100_000
+
+
+@dataclass
+class IngestProgress:
+    """Running totals reported after every upserted batch."""
+
+    batches: int = 0
+    documents: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        """Return the average ingestion throughput so far."""
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+
+def _normalize(item: Any) -> Any:
+    """Accept the camelCase `pageContent` key used by the JS loaders' JSON dumps."""
+    if isinstance(item, dict) and "page_content" not in item and "pageContent" in item:
+        item = {**item, "page_content": item["pageContent"]}
+        del item["pageContent"]
+    return item
+
+
+def iter_serialized_docs(path: str) -> Iterator[Any]:
+    """Yield serialized documents from a JSON array or JSONL file one at a time.
+
+    JSON arrays are decoded incrementally with `json.JSONDecoder.raw_decode`, so
+    memory use stays bounded by the largest single document rather than the file.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as file_content:
+            for line in file_content:
+                if line.strip():
+                    yield _normalize(json.loads(line))
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as file_content:
+        buffer = ""
+        eof = False
+        started = False
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer and not eof:
+                    chunk = file_content.read(_READ_SIZE)
+                    eof = not chunk
+                    buffer += chunk
+                    continue
+                if not buffer.startswith("["):
+                    raise ValueError(f"{path} must contain a JSON array of documents")
+                buffer = buffer[1:]
+                started = True
+                continue
+            if buffer.startswith(","):
+                buffer = buffer[1:]
+                continue
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                item, end = None, -1
+            # A value that ends exactly at the buffer boundary may be truncated.
+            if end == -1 or (end == len(buffer) and not eof):
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                chunk = file_content.read(_READ_SIZE)
+                eof = not chunk
+                buffer += chunk
+                continue
+            buffer = buffer[end:]
+            yield _normalize(item)
+
+
+def _batched(items: Iterable[Any], batch_size: int) -> Iterator[list[Any]]:
+    batch: list[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def stream_ingest(
+    add_documents: Callable[[list[Document]], Any],
+    items: Union[Iterable[Any], AsyncIterator[Any]],
+    *,
+    batch_size: int = 64,
+    max_concurrency: int = 4,
+    on_progress: Optional[Callable[[IngestProgress], None]] = None,
+    dedupe_window: int = DEFAULT_DEDUPE_WINDOW,
+) -> IngestProgress:
+    """Embed and upsert documents in batches with bounded in-flight concurrency.
+
+    Args:
+        add_documents: Coroutine function that upserts one batch, e.g. a
+            retriever's `aadd_documents`.
+        items: Documents, dicts or strings in any form accepted by `reduce_docs`.
+            May be a sync or async iterator. A sync iterator is advanced in a
+            worker thread, so file reads never block the event loop.
+        batch_size: Number of documents embedded and written per call.
+        max_concurrency: Maximum number of batches in flight at once.
+        on_progress: Called with the running totals after every completed batch.
+        dedupe_window: How many of the most recent document uuids are
+            remembered to skip repeats. Memory stays flat however large the
+            input is; a repeat further back than this is upserted again, which
+            stores a duplicate unless the vector store dedupes by id.
+
+    Returns:
+        IngestProgress: The final totals.
+    """
+    progress = IngestProgress()
+    seen_ids: OrderedDict[str, None] = OrderedDict()
+    pending: set[asyncio.Task] = set()
+    started = time.perf_counter()
+
+    async def upsert(batch: list[Document]) -> int:
+        await add_documents(batch)
+        return len(batch)
+
+    def record(done: set[asyncio.Task]) -> None:
+        for task in done:
+            progress.documents += task.result()
+            progress.batches += 1
+        progress.elapsed = time.perf_counter() - started
+        logger.info(
+            "Ingested %d documents in %d batches (%.1f docs/s)",
+            progress.documents,
+            progress.batches,
+            progress.docs_per_second,
+        )
+        if on_progress is not None:
+            on_progress(progress)
+
+    async def submit(raw_batch: list[Any]) -> None:
+        docs = []
+        for doc in reduce_docs([], raw_batch):
+            uuid = doc.metadata["uuid"]
+            if uuid in seen_ids:
+                seen_ids.move_to_end(uuid)
+                continue
+            seen_ids[uuid] = None
+            if len(seen_ids) > dedupe_window:
+                seen_ids.popitem(last=False)
+            docs.append(doc)
+        progress.skipped += len(raw_batch) - len(docs)
+        if not docs:
+            return
+        if len(pending) >= max_concurrency:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            record(done)
+        pending.add(asyncio.create_task(upsert(docs)))
+
+    try:
+        if hasattr(items, "__aiter__"):
+            batch: list[Any] = []
+            async for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    await submit(batch)
+                    batch = []
+            if batch:
+                await submit(batch)
+        else:
+            batches = _batched(items, batch_size)
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                await submit(batch)
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            pending.clear()
+            record(done)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    progress.elapsed = time.perf_counter() - started
+    return progress
@@ -19,3 +19,73 @@ class Configuration(BaseConfiguration):
             "description": "The language model used for processing and refining queries. Should be in the form: provider/model-name."
         },
     )
+
+    context_token_budget: int = field(
+        default=4000,
+        metadata={
+            "description": "Maximum number of tokens of retrieved documents placed in the generation prompt. Overlapping chunks are deduplicated before packing."
+        },
+    )
+
+    speculative_retrieval: bool = field(
+        default=False,
+        metadata={
+            "description": "Start retrieval in parallel with query routing and use the result if the router chooses retrieval. Trades a wasted retrieval on direct answers for lower latency on retrieval-routed queries."
+        },
+    )
+
+    semantic_cache: bool = field(
+        default=False,
+        metadata={
+            "description": "Answer near-duplicate queries from a semantic cache keyed on the query embedding, skipping routing, retrieval and generation."
+        },
+    )
+
+    semantic_cache_threshold: float = field(
+        default=0.95,
+        metadata={
+            "description": "Minimum cosine similarity between query embeddings for a semantic cache hit."
+        },
+    )
+
+    semantic_cache_ttl: float = field(
+        default=3600.0,
+        metadata={
+            "description": "Number of seconds a cached answer stays valid."
+        },
+    )
+
+    semantic_cache_size: int = field(
+        default=1024,
+        metadata={
+            "description": "Maximum number of cached answers. The least recently used answer is evicted first."
+        },
+    )
+
+    local_router: bool = field(
+        default=False,
+        metadata={
+            "description": "Try a local nearest-centroid classifier before the routing LLM. Queries it confidently routes to retrieval skip the LLM call; every LLM routing decision is logged and learned from."
+        },
+    )
+
+    local_router_threshold: float = field(
+        default=0.9,
+        metadata={
+            "description": "Minimum classifier confidence for routing a query to retrieval without the LLM."
+        },
+    )
+
+    local_router_min_examples: int = field(
+        default=50,
+        metadata={
+            "description": "Labelled routing decisions each route needs, seeds included, before the local classifier decides anything. Until then every query goes to the LLM router, whose decisions are learned from."
+        },
+    )
+
+    local_router_log: str = field(
+        default=".cache/query_router_decisions.jsonl",
+        metadata={
+            "description": "JSONL file of logged routing decisions the local classifier is trained from."
+        },
+    )
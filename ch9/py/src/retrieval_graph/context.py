@@ -0,0 +1,126 @@
+"""Assemble retrieved documents into a token-budgeted XML context."""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional
+
+from langchain_core.documents import Document
+
+Tokenizer = Callable[[str], int]
+
+
+def approximate_token_count(text: str) -> int:
+    """Estimate tokens as one per four characters, the usual rule of thumb for English."""
+    return (len(text) + 3) // 4
+
+
+def _format_doc(doc: Document) -> str:
+    """Format a single document as XML.
+
+    Args:
+        doc (Document): The document to format.
+
+    Returns:
+        str: The formatted document as an XML string.
+    """
+    metadata = doc.metadata or {}
+    meta = "".join(f" {k}={v!r}" for k, v in metadata.items())
+    if meta:
+        meta = f" {meta}"
+
+    return f"<document{meta}>\n{doc.page_content}\n</document>"
+
+
+class _FragmentCache:
+    """Bounded LRU cache of formatted fragments and their token counts, keyed by uuid."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple, tuple[str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, doc: Document, tokenizer: Tokenizer) -> tuple[str, int]:
+        doc_id = (doc.metadata or {}).get("uuid")
+        if doc_id is None:
+            fragment = _format_doc(doc)
+            return fragment, tokenizer(fragment)
+        key = (doc_id, tokenizer)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        fragment = _format_doc(doc)
+        entry = (fragment, tokenizer(fragment))
+        with self._lock:
+            self._items[key] = entry
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return entry
+
+
+_fragment_cache = _FragmentCache()
+
+
+def _shingles(text: str, size: int) -> set[int]:
+    words = text.split()
+    if len(words) <= size:
+        return {hash(" ".join(words))}
+    return {hash(" ".join(words[i : i + size])) for i in range(len(words) - size + 1)}
+
+
+class ContextBuilder:
+    """Pack documents into an XML context that fits a token budget.
+
+    Documents are taken in retrieval order. With `dedupe_threshold` set, exact
+    repeats (same uuid) are dropped, and so is a document when that fraction
+    of its word shingles already appeared in an earlier document, which
+    catches the overlap between neighbouring splitter chunks. With
+    `dedupe_threshold=None` every document is kept.
+    Documents that would exceed the budget are skipped so smaller ones later
+    in the list can still fit.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        *,
+        tokenizer: Tokenizer = approximate_token_count,
+        dedupe_threshold: Optional[float] = 0.8,
+        shingle_size: int = 8,
+    ) -> None:
+        """Configure the budget, tokenizer and near-duplicate detection."""
+        self.token_budget = token_budget
+        self.tokenizer = tokenizer
+        self.dedupe_threshold = dedupe_threshold
+        self.shingle_size = shingle_size
+
+    def iter_context(self, docs: Optional[Iterable[Document]]) -> Iterator[str]:
+        """Yield the context piece by piece as documents are accepted."""
+        remaining = self.token_budget
+        seen_ids: set[str] = set()
+        seen_shingles: set[int] = set()
+        opened = False
+        for doc in docs or ():
+            doc_id = (doc.metadata or {}).get("uuid")
+            if self.dedupe_threshold is not None:
+                if doc_id is not None and doc_id in seen_ids:
+                    continue
+                shingles = _shingles(doc.page_content, self.shingle_size)
+                if shingles and len(shingles & seen_shingles) >= self.dedupe_threshold * len(shingles):
+                    continue
+            fragment, tokens = _fragment_cache.get(doc, self.tokenizer)
+            if remaining is not None:
+                if tokens > remaining:
+                    continue
+                remaining -= tokens
+            if self.dedupe_threshold is not None:
+                if doc_id is not None:
+                    seen_ids.add(doc_id)
+                seen_shingles |= shingles
+            yield f"{'' if opened else '<documents>'}\n{fragment}"
+            opened = True
+        yield "\n</documents>" if opened else "<documents></documents>"
+
+    def build(self, docs: Optional[Iterable[Document]]) -> str:
+        """Return the full context string."""
+        return "".join(self.iter_context(docs))
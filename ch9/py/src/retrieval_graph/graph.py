@@ -1,8 +1,8 @@
+import asyncio
+from functools import cache
 from typing import Literal
-from langchain.hub import pull
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import AIMessage, HumanMessage
 import os
 from dotenv import load_dotenv
 
@@ -11,9 +11,11 @@ load_dotenv()
 from langgraph.graph import END, START, StateGraph
 from pydantic import BaseModel
 
-from retrieval_graph.utils import format_docs, load_chat_model
+from retrieval_graph.context import ContextBuilder
+from retrieval_graph.utils import load_chat_model, load_structured_model, warm_up_models
 from retrieval_graph.configuration import Configuration
-from shared.retrieval import make_retriever
+from shared.prompts import get_prompt
+from shared.retrieval import get_text_encoder, make_retriever
 from langchain_core.runnables import RunnableConfig
 
 from retrieval_graph.state import AgentState
@@ -24,24 +26,114 @@ class Schema(BaseModel):
     direct_answer: str
 
 
+async def _remember_answer(state: AgentState, configuration: Configuration, answer) -> None:
+    """Store `answer` in the semantic cache when it is enabled."""
+    if not configuration.semantic_cache or not isinstance(answer, str):
+        return
+    from retrieval_graph.semantic_cache import get_semantic_cache
+
+    # The encoder's own cache makes re-embedding the query free after check_cache.
+    embedding = await get_text_encoder(configuration.embedding_model).aembed_query(state["query"])
+    cache = get_semantic_cache(configuration.embedding_model, configuration.semantic_cache_size)
+    cache.store(embedding, answer)
+
+
+@cache
+def _query_router(log_path: str, threshold: float, min_examples: int):
+    """Local retrieve/direct classifier shared by every run that uses the same log."""
+    # Imported here so graphs without the local router never load NumPy.
+    from retrieval_graph.hybrid_router import CentroidClassifier, HybridRouter
+
+    classifier = CentroidClassifier(
+        {
+            "retrieve": [
+                "What does the document say about this topic?",
+                "According to the docs, how do I configure it?",
+                "Summarize the section about pricing.",
+                "Which chapter explains the installation steps?",
+            ],
+            "direct": [
+                "Hi!",
+                "Hello, how are you?",
+                "Thanks, that helps.",
+                "What can you do?",
+            ],
+        },
+        log_path=log_path,
+    )
+    return HybridRouter(classifier, threshold=threshold, min_examples=min_examples)
+
+
+async def check_cache(state: AgentState, *, config: RunnableConfig):
+    """Answer from the semantic cache when a near-duplicate query was answered before."""
+    configuration = Configuration.from_runnable_config(config)
+    if configuration.semantic_cache:
+        # Imported here so graphs without the cache never load NumPy.
+        from retrieval_graph.semantic_cache import get_semantic_cache
+
+        embedding = await get_text_encoder(configuration.embedding_model).aembed_query(state["query"])
+        cache = get_semantic_cache(configuration.embedding_model, configuration.semantic_cache_size)
+        answer = cache.lookup(
+            embedding, configuration.semantic_cache_threshold, configuration.semantic_cache_ttl)
+        if answer is not None:
+            return {"route": END, "messages": [AIMessage(content=answer)]}
+    return {"route": "check_query_type"}
+
+
+async def route_cache(state: AgentState, *, config: RunnableConfig):
+    """End on a cache hit, otherwise go on to routing the query."""
+    if state["route"] == END:
+        return END
+    return "check_query_type"
+
+
 async def check_query_type(state: AgentState, *, config: RunnableConfig):
     configuration = Configuration.from_runnable_config(config)
-    structured_llm = load_chat_model(
-        configuration.query_model).with_structured_output(Schema)
+    structured_llm = load_structured_model(configuration.query_model, Schema)
     routing_prompt = ChatPromptTemplate.from_messages([
         ("system", "You are a routing assistant. Your job is to determine if a question needs document retrieval or can be answered directly.\n\nRespond with either:\n'retrieve' - if the question requires retrieving documents\n'direct' - if the question can be answered directly AND your direct answer"),
         ("human", "{query}")
     ])
 
-    formatted_prompt = routing_prompt.invoke({"query": state["query"]})
-    response = structured_llm.invoke(formatted_prompt)
+    router = None
+    if configuration.local_router:
+        # The first call replays the decision log from disk.
+        router = await asyncio.to_thread(
+            _query_router,
+            configuration.local_router_log,
+            configuration.local_router_threshold,
+            configuration.local_router_min_examples,
+        )
+        # Only retrieval can be decided locally; a direct answer needs the LLM anyway.
+        if router.predict(state["query"], accept={"retrieve"}) == "retrieve":
+            return {"route": "retrieve_documents"}
+
+    speculative = None
+    if configuration.speculative_retrieval:
+        # Retrieve while the router decides; the result is dropped for direct answers.
+        speculative = asyncio.create_task(_retrieve(state["query"], config))
+    try:
+        formatted_prompt = await routing_prompt.ainvoke({"query": state["query"]})
+        response = await structured_llm.ainvoke(formatted_prompt)
+    except BaseException:
+        if speculative is not None:
+            speculative.cancel()
+        raise
 
     route = response.route
+    if router is not None:
+        await asyncio.to_thread(
+            router.record, state["query"], "retrieve" if route == "retrieve" else "direct")
 
     if route == "retrieve":
+        if speculative is not None:
+            return {"route": "generate_response", "documents": await speculative}
         return {"route": "retrieve_documents"}
     else:
+        if speculative is not None:
+            speculative.cancel()
         direct_answer = response.direct_answer
+        await _remember_answer(state, configuration, direct_answer)
         return {"route": END, "messages": [HumanMessage(content=direct_answer)]}
 
 
@@ -52,33 +144,42 @@ async def route_query(state: AgentState, *, config: RunnableConfig):
 
     if route == "retrieve_documents":
         return "retrieve_documents"
+    elif route == "generate_response":
+        return "generate_response"
     else:
         return END
 
 
+async def _retrieve(query: str, config: RunnableConfig):
+    with make_retriever(config) as retriever:
+        return await retriever.ainvoke(query)
+
+
 async def retrieve_documents(state: AgentState, *, config: RunnableConfig):
-    configuration = Configuration.from_runnable_config(config)
-    retriever = make_retriever(configuration)
-    response = retriever.invoke(state["query"])
+    response = await _retrieve(state["query"], config)
     return {"documents": response}
 
 
 async def generate_response(state: AgentState, *, config: RunnableConfig):
     configuration = Configuration.from_runnable_config(config)
-    context = format_docs(state["documents"])
-    prompt_template = pull("rlm/rag-prompt")
-    formatted_prompt = prompt_template.invoke(
+    context = ContextBuilder(configuration.context_token_budget).build(state["documents"])
+    # Only the first resolution touches disk or the hub; keep it off the event loop
+    prompt_template = await asyncio.to_thread(get_prompt, "rlm/rag-prompt")
+    formatted_prompt = await prompt_template.ainvoke(
         {"context": context, "question": state["query"]})
     messages = formatted_prompt.messages + state["messages"]
-    response = load_chat_model(configuration.query_model).invoke(messages)
+    response = await load_chat_model(configuration.query_model).ainvoke(messages)
+    await _remember_answer(state, configuration, response.content)
     return {"messages": response}
 
 
 builder = StateGraph(AgentState, config_schema=Configuration)
+builder.add_node("check_cache", check_cache)
 builder.add_node("check_query_type", check_query_type)
 builder.add_node("retrieve_documents", retrieve_documents)
 builder.add_node("generate_response", generate_response)
-builder.add_edge(START, "check_query_type")
+builder.add_edge(START, "check_cache")
+builder.add_conditional_edges("check_cache", route_cache, ["check_query_type", END])
 builder.add_conditional_edges("check_query_type", route_query)
 builder.add_edge("retrieve_documents", "generate_response")
 builder.add_edge("generate_response", END)
@@ -86,3 +187,8 @@ builder.add_edge("generate_response", END)
 # Compile into a graph object that you can invoke and deploy.
 graph = builder.compile()
 graph.name = "RetrievalGraph"
+
+# Build the default chat model and its routing variant when the server starts,
+# so the first request does not pay for client construction.
+if os.environ.get("WARM_UP_MODELS", "").lower() in ("1", "true", "yes"):
+    warm_up_models([Configuration().query_model], structured_schemas=[Schema])
@@ -0,0 +1,219 @@
+"""Hybrid router: a local nearest-centroid classifier with an LLM fallback.
+
+Choosing between two or three labels does not need a full LLM round trip for
+most queries. HybridRouter first asks a CentroidClassifier, which compares the
+query against one centroid per label, and only calls the LLM when the
+classifier's confidence is below the threshold. Every LLM decision is logged
+and folded into the centroids, so the local path covers more queries over time.
+
+The default features are hashed character trigrams and words, which take
+microseconds and need no API call. Pass embedding_features(embeddings) to
+classify on embeddings instead.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import zlib
+from typing import (
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+Featurizer = Callable[[Sequence[str]], np.ndarray]
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]+")
+
+
+def hashed_ngrams(texts: Sequence[str], dims: int = 1 << 14) -> np.ndarray:
+    """Return L2-normalized bags of hashed words and character trigrams, one row per text."""
+    features = np.zeros((len(texts), dims), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _WORD_RE.findall(text.lower())
+        grams = list(words)
+        for word in words:
+            padded = f" {word} "
+            grams.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+        for gram in grams:
+            features[row, zlib.crc32(gram.encode()) % dims] += 1.0
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.where(norms == 0, 1, norms)
+
+
+def embedding_features(embeddings: Embeddings) -> Featurizer:
+    """Build a featurizer backed by an embedding model.
+
+    Each batch of texts costs one `embed_documents` call.
+    """
+
+    def featurize(texts: Sequence[str]) -> np.ndarray:
+        vectors = np.asarray(embeddings.embed_documents(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    return featurize
+
+
+class CentroidClassifier:
+    """Nearest-centroid classifier over L2-normalized text features.
+
+    Args:
+        examples: Seed texts per label.
+        featurize: Maps texts to L2-normalized feature rows.
+        log_path: JSONL file of labelled decisions, replayed on start and
+            appended to by `learn`.
+        temperature: Softmax temperature applied to the cosine similarities.
+    """
+
+    def __init__(
+        self,
+        examples: Optional[Dict[str, List[str]]] = None,
+        featurize: Featurizer = hashed_ngrams,
+        log_path: Optional[str] = None,
+        temperature: float = 0.03,
+    ) -> None:
+        """Build the centroids from `examples` and the decisions in `log_path`."""
+        self.featurize = featurize
+        self.log_path = log_path
+        self.temperature = temperature
+        self.labels: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self._sums: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        seeds = [(text, label) for label, texts in (examples or {}).items() for text in texts]
+        if log_path and os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                seeds.extend((d["text"], d["label"]) for d in map(json.loads, f) if d)
+        if seeds:
+            self._add([text for text, _ in seeds], [label for _, label in seeds])
+
+    def _add(self, texts: Sequence[str], labels: Sequence[str]) -> None:
+        features = self.featurize(texts)
+        with self._lock:
+            for label in labels:
+                if label not in self.labels:
+                    self.labels.append(label)
+                self.counts[label] = self.counts.get(label, 0) + 1
+            sums = np.zeros((len(self.labels), features.shape[1]), dtype=np.float32)
+            if self._sums is not None:
+                sums[: len(self._sums)] = self._sums
+            np.add.at(sums, [self.labels.index(label) for label in labels], features)
+            self._sums = sums
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            self._centroids = sums / np.where(norms == 0, 1, norms)
+
+    def learn(self, text: str, label: str) -> None:
+        """Fold a labelled decision into the centroids and append it to the log."""
+        self._add([text], [label])
+        if self.log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"text": text, "label": label}, ensure_ascii=False) + "\n")
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Return the nearest label and its softmax probability over all labels.
+
+        With fewer than two known labels the confidence is 0.
+        """
+        centroids = self._centroids
+        if centroids is None or len(centroids) < 2:
+            return (self.labels[0] if self.labels else None), 0.0
+        similarities = centroids @ self.featurize([text])[0]
+        scaled = np.exp((similarities - similarities.max()) / self.temperature)
+        probabilities = scaled / scaled.sum()
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+
+class HybridRouter:
+    """Route locally when the classifier is confident, and through the LLM otherwise.
+
+    Args:
+        classifier: The local classifier tried first.
+        threshold: Minimum confidence for a local decision.
+        learn: Feed LLM decisions back into the classifier.
+        min_examples: Labelled examples every label needs before anything is
+            decided locally. A few seed texts are not enough: hashed trigrams
+            of unrelated questions can still land confidently on one label.
+    """
+
+    def __init__(
+        self,
+        classifier: CentroidClassifier,
+        threshold: float = 0.8,
+        learn: bool = True,
+        min_examples: int = 0,
+    ) -> None:
+        """Wrap `classifier` with zeroed decision counters."""
+        self.classifier = classifier
+        self.threshold = threshold
+        self.learn = learn
+        self.min_examples = min_examples
+        self.local_decisions = 0
+        self.llm_decisions = 0
+
+    def predict(self, text: str, accept: Optional[Collection[str]] = None) -> Optional[str]:
+        """Return the local label if it is confident enough, otherwise None.
+
+        With `accept` set, only those labels are decided locally.
+        """
+        counts = self.classifier.counts
+        if len(counts) < 2 or min(counts.values()) < self.min_examples:
+            return None
+        label, confidence = self.classifier.predict(text)
+        if label is not None and confidence >= self.threshold and (accept is None or label in accept):
+            self.local_decisions += 1
+            return label
+        return None
+
+    def record(self, text: str, label: str) -> str:
+        """Count an LLM decision, learn from it and return its label."""
+        self.llm_decisions += 1
+        if self.learn:
+            self.classifier.learn(text, label)
+        return label
+
+    def route(self, text: str, fallback: Callable[[], str]) -> str:
+        """Route `text` locally when confident, otherwise through `fallback`.
+
+        `fallback` is the LLM router; its answer is learned from.
+        """
+        label = self.predict(text)
+        if label is not None:
+            return label
+        return self.record(text, fallback())
+
+    async def aroute(self, text: str, fallback: Callable[[], Awaitable[str]]) -> str:
+        """Async variant of `route`; `fallback` is awaited and learning runs in a thread."""
+        label = self.predict(text)
+        if label is not None:
+            return label
+        label = await fallback()
+        return await asyncio.to_thread(self.record, text, label)
+
+    @property
+    def local_ratio(self) -> float:
+        """Share of decisions made locally so far."""
+        total = self.local_decisions + self.llm_decisions
+        return self.local_decisions / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Return the local and LLM decision counts and the local ratio."""
+        return {
+            "local_decisions": self.local_decisions,
+            "llm_decisions": self.llm_decisions,
+            "local_ratio": self.local_ratio,
+        }
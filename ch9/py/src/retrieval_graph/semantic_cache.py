@@ -0,0 +1,112 @@
+"""Semantic answer cache keyed on query embeddings."""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """Size-bounded cache that returns answers for near-duplicate queries.
+
+    Query embeddings are kept L2-normalized in a preallocated matrix, so a
+    lookup is one matrix-vector product. Entries older than the TTL are
+    ignored and, when the cache is full, the least recently used entry is
+    replaced.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """Create an empty cache holding at most `capacity` answers."""
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._answers: list[Optional[str]] = [None] * capacity
+        self._created = np.zeros(capacity)
+        self._last_used = np.zeros(capacity)
+        self._size = 0
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding: list[float], threshold: float, ttl: float) -> Optional[str]:
+        """Return the cached answer for the most similar live query, if any.
+
+        Args:
+            embedding (list[float]): The query embedding.
+            threshold (float): Minimum cosine similarity for a hit.
+            ttl (float): Maximum entry age in seconds.
+        """
+        query = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            if self._vectors is None or not self._size:
+                self.misses += 1
+                return None
+            scores = self._vectors[: self._size] @ query
+            scores[now - self._created[: self._size] > ttl] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < threshold:
+                self.misses += 1
+                return None
+            self._last_used[best] = now
+            self.hits += 1
+            return self._answers[best]
+
+    def store(self, embedding: list[float], answer: str) -> None:
+        """Cache `answer` for the query with `embedding`."""
+        vector = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._vectors[slot] = vector
+            self._answers[slot] = answer
+            self._created[slot] = now
+            self._last_used[slot] = now
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        """Return the fraction of lookups that were hits, if any were made."""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def stats(self) -> dict[str, Optional[float]]:
+        """Return hit/miss counters, hit ratio and the number of cached answers."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+            "size": self._size,
+        }
+
+
+_CACHES: dict[tuple[str, int], SemanticCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_semantic_cache(embedding_model: str, capacity: int) -> SemanticCache:
+    """Return the process-wide cache for `embedding_model`."""
+    with _CACHES_LOCK:
+        key = (embedding_model, capacity)
+        if key not in _CACHES:
+            _CACHES[key] = SemanticCache(capacity)
+        return _CACHES[key]
+
+
+def semantic_cache_stats() -> dict[str, dict[str, Optional[float]]]:
+    """Return the metrics of every semantic cache in this process."""
+    with _CACHES_LOCK:
+        return {
+            f"{model}@{capacity}": cache.stats() for (model, capacity), cache in _CACHES.items()
+        }
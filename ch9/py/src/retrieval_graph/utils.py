@@ -1,30 +1,19 @@
-from typing import Optional
+import json
+import threading
+from typing import Any, Iterable, Optional
 from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
-from langchain.chat_models import init_chat_model
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 
-
-def _format_doc(doc: Document) -> str:
-    """Format a single document as XML.
-
-    Args:
-        doc (Document): The document to format.
-
-    Returns:
-        str: The formatted document as an XML string.
-    """
-    metadata = doc.metadata or {}
-    meta = "".join(f" {k}={v!r}" for k, v in metadata.items())
-    if meta:
-        meta = f" {meta}"
-
-    return f"<document{meta}>\n{doc.page_content}\n</document>"
+from retrieval_graph.context import ContextBuilder
 
 
 def format_docs(docs: Optional[list[Document]]) -> str:
     """Format a list of documents as XML.
 
     This function takes a list of Document objects and formats them into a single XML string.
+    It applies no token budget or deduplication; use `ContextBuilder` for that.
 
     Args:
         docs (Optional[list[Document]]): A list of Document objects to format, or None.
@@ -47,23 +36,76 @@ def format_docs(docs: Optional[list[Document]]) -> str:
         >>> print(format_docs(None))
         <documents></documents>
     """
-    if not docs:
-        return "<documents></documents>"
-    formatted = "\n".join(_format_doc(doc) for doc in docs)
-    return f"""<documents>
-{formatted}
-</documents>"""
+    return ContextBuilder(dedupe_threshold=None).build(docs)
 
 
-def load_chat_model(fully_specified_name: str) -> BaseChatModel:
-    """Load a chat model from a fully specified name.
+# Chat models are cached per (provider, model, kwargs) so every request reuses
+# the same client and its HTTP connection pool.
+_MODELS: dict[tuple, Any] = {}
+_MODELS_LOCK = threading.Lock()
 
-    Args:
-        fully_specified_name (str): String in the format 'provider/model'.
-    """
+
+def _model_key(fully_specified_name: str, kwargs: dict[str, Any]) -> tuple[str, str, str]:
     if "/" in fully_specified_name:
         provider, model = fully_specified_name.split("/", maxsplit=1)
     else:
         provider = ""
         model = fully_specified_name
-    return init_chat_model(model, model_provider=provider)
+    return provider, model, json.dumps(kwargs, sort_keys=True, default=repr)
+
+
+def load_chat_model(fully_specified_name: str, **kwargs: Any) -> BaseChatModel:
+    """Load a chat model from a fully specified name.
+
+    Instances are cached, so repeated calls with the same name and keyword
+    arguments return the same client.
+
+    Args:
+        fully_specified_name (str): String in the format 'provider/model'.
+        **kwargs: Extra keyword arguments passed to `init_chat_model`.
+    """
+    key = _model_key(fully_specified_name, kwargs)
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            # langchain's chat model registry is heavy; import it on first use.
+            from langchain.chat_models import init_chat_model
+
+            provider, model, _ = key
+            _MODELS[key] = init_chat_model(model, model_provider=provider, **kwargs)
+        return _MODELS[key]
+
+
+def load_structured_model(
+    fully_specified_name: str, schema: type[BaseModel], **kwargs: Any
+) -> Runnable:
+    """Load a cached `with_structured_output` wrapper around a chat model.
+
+    Args:
+        fully_specified_name (str): String in the format 'provider/model'.
+        schema (type[BaseModel]): The output schema.
+        **kwargs: Extra keyword arguments passed to `init_chat_model`.
+    """
+    key = (*_model_key(fully_specified_name, kwargs), schema)
+    with _MODELS_LOCK:
+        if key in _MODELS:
+            return _MODELS[key]
+    structured = load_chat_model(fully_specified_name, **kwargs).with_structured_output(schema)
+    with _MODELS_LOCK:
+        return _MODELS.setdefault(key, structured)
+
+
+def warm_up_models(
+    fully_specified_names: Iterable[str], structured_schemas: Iterable[type[BaseModel]] = ()
+) -> None:
+    """Build the chat models and structured-output variants ahead of the first request.
+
+    Args:
+        fully_specified_names (Iterable[str]): Models to build, as 'provider/model'.
+        structured_schemas (Iterable[type[BaseModel]]): Schemas to pre-build a
+            structured-output wrapper for, on every model.
+    """
+    schemas = list(structured_schemas)
+    for name in fully_specified_names:
+        load_chat_model(name)
+        for schema in schemas:
+            load_structured_model(name, schema)
@@ -27,12 +27,12 @@ class BaseConfiguration:
     )
 
     retriever_provider: Annotated[
-        Literal["supabase", "chroma"],
+        Literal["supabase", "chroma", "local"],
         {"__template_metadata__": {"kind": "retriever"}},
     ] = field(
         default="chroma",
         metadata={
-            "description": "The vector store provider to use for retrieval. Options are 'supabase' or 'chroma'."
+            "description": "The vector store provider to use for retrieval. Options are 'supabase', 'chroma', or 'local' (an in-process store persisted under LOCAL_VECTOR_STORE_DIR)."
         },
     )
 
@@ -43,6 +43,13 @@ class BaseConfiguration:
         },
     )
 
+    prefilter_selectivity: float = field(
+        default=0.05,
+        metadata={
+            "description": "Chroma only: when at most this fraction of the collection matches the search filter, the matching vectors are fetched and scored exactly instead of filtering inside the ANN search. Broader filters over-fetch unfiltered neighbours and drop non-matching ones client-side."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls: Type[T], config: Optional[RunnableConfig] = None
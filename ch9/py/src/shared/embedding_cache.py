@@ -0,0 +1,218 @@
+"""Persistent, content-addressed cache in front of an embeddings model."""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3"
+)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+# Pending last_used updates are written once this many have piled up.
+_TOUCH_BATCH = 1000
+# An eviction pass trims the cache to this fraction of max_entries, so the
+# next one is only due after that many new vectors.
+_EVICT_TO = 0.9
+
+
+def _cache_key(namespace: str, text: str) -> str:
+    """Hash the model namespace and text into a stable cache key."""
+    return hashlib.sha256(f"{namespace}\x00{text}".encode()).hexdigest()
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that stores vectors in a local SQLite file.
+
+    Vectors are keyed by a hash of the model namespace plus the text, so the
+    same text embedded by the same model is only ever sent to the provider once.
+    The cache is bounded to `max_entries` rows and evicts the least recently
+    used vectors first. Cache hits only record their use time in memory; those
+    are written in batches and before every eviction pass, so reads do not
+    write to SQLite.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        *,
+        namespace: str,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """Open (or create) the SQLite cache at `path`."""
+        self.underlying = underlying
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: dict[str, float] = {}
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    def _flush_touches(self) -> None:
+        """Write the pending last_used updates; the caller holds the lock."""
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()],
+        )
+        self._conn.commit()
+        self._touched.clear()
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        """Fetch cached vectors for `keys`, count hits and misses, and note their use."""
+        found: dict[str, list[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay below SQLite's default bound-parameter limit.
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update((key, _unpack(blob)) for key, blob in rows)
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += len(unique_keys) - len(found)
+            now = time.time()
+            self._touched.update((key, now) for key in found)
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touches()
+        return found
+
+    def _store(self, items: dict[str, list[float]]) -> None:
+        """Persist freshly computed vectors and evict the oldest overflow."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            # Another process may have stored the same text; its vector is the same.
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, _pack(vector), now) for key, vector in items.items()],
+            )
+            self._count += cursor.rowcount
+            if self._count > self.max_entries:
+                self._flush_touches()
+                # Other processes sharing the file may have added or evicted rows.
+                (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+                overflow = self._count - int(self.max_entries * _EVICT_TO)
+                if self._count > self.max_entries and overflow > 0:
+                    cursor = self._conn.execute(
+                        "DELETE FROM embeddings WHERE key IN ("
+                        "SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._count -= cursor.rowcount
+            self._conn.commit()
+
+    def _partition(
+        self, texts: list[str]
+    ) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        """Split `texts` into cached vectors and the unique texts still to embed."""
+        keys = [_cache_key(self.namespace, text) for text in texts]
+        cached = self._lookup(keys)
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        return keys, cached, missing
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents, calling the underlying model only for cache misses."""
+        keys, cached, missing = self._partition(texts)
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Asynchronously embed documents, calling the model only for cache misses."""
+        # SQLite calls block, so keep them off the event loop.
+        keys, cached, missing = await asyncio.to_thread(self._partition, texts)
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await asyncio.to_thread(self._store, computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a query, reusing a cached vector when available."""
+        key = _cache_key(self.namespace, text)
+        cached = self._lookup([key])
+        if key in cached:
+            return cached[key]
+        vector = self.underlying.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Asynchronously embed a query, reusing a cached vector when available."""
+        key = _cache_key(self.namespace, text)
+        cached = await asyncio.to_thread(self._lookup, [key])
+        if key in cached:
+            return cached[key]
+        vector = await self.underlying.aembed_query(text)
+        await asyncio.to_thread(self._store, {key: vector})
+        return vector
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        """Return the fraction of lookups served from the cache, if any were made."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return hits / total if total else None
+
+    def stats(self) -> dict[str, Optional[float]]:
+        """Return hit/miss counters and the number of cached vectors."""
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            "size": size,
+        }
+
+    def close(self) -> None:
+        """Write pending use times and close the underlying SQLite connection."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.close()
@@ -0,0 +1,179 @@
+"""Chroma vector store with a client-side metadata index for filtered search.
+
+Chroma evaluates `where` filters inside its HNSW search, which degrades badly
+when only a few documents match: the graph walk visits many non-matching
+nodes and can still come back with fewer than k results. `IndexedChroma`
+keeps a `MetadataIndex` of the collection and uses the filter's selectivity
+to pick a strategy:
+
+* pre-filter: at most `prefilter_selectivity` of the collection (and at most
+  `max_prefilter_candidates` documents) matches. Fetch only the matching
+  vectors by id and score them exactly.
+* post-filter: the filter is broad. Run an unfiltered ANN query for enough
+  neighbours that k of them should match, and drop the rest client-side.
+* anything the index cannot evaluate (unknown operators, `where_document`)
+  goes to Chroma unchanged.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Iterable
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from shared.metadata_index import MetadataIndex, popcount
+
+
+class IndexedChroma(Chroma):
+    """Chroma store that pre- or post-filters with a client-side metadata index."""
+
+    def __init__(
+        self,
+        *args: Any,
+        prefilter_selectivity: float = 0.05,
+        max_prefilter_candidates: int = 5000,
+        oversample: float = 2.0,
+        refresh_interval: float = 30.0,
+        **kwargs: Any,
+    ) -> None:
+        """Create the store; the metadata index is built on the first filtered search."""
+        super().__init__(*args, **kwargs)
+        self.prefilter_selectivity = prefilter_selectivity
+        self.max_prefilter_candidates = max_prefilter_candidates
+        self.oversample = oversample
+        self.refresh_interval = refresh_interval
+        self.metadata_index = MetadataIndex()
+        self.strategy_counts = {"prefilter": 0, "postfilter": 0, "chroma": 0}
+        self._index_lock = threading.Lock()
+        self._index_checked = 0.0
+        self._index_built = False
+
+    def _refresh_index(self, page_size: int = 1000) -> None:
+        """(Re)build the index when the collection changed outside this process."""
+        now = time.monotonic()
+        if self._index_built and now - self._index_checked < self.refresh_interval:
+            return
+        with self._index_lock:
+            if self._index_built and now - self._index_checked < self.refresh_interval:
+                return
+            self._index_checked = now
+            if self._index_built and self._collection.count() == len(self.metadata_index):
+                return
+            self.metadata_index.clear()
+            offset = 0
+            while True:
+                page = self._collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                if not page["ids"]:
+                    break
+                self.metadata_index.add(page["ids"], page["metadatas"])
+                offset += len(page["ids"])
+            self._index_built = True
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Add texts to the collection and to the metadata index."""
+        texts = list(texts)
+        ids = super().add_texts(texts, metadatas=metadatas, ids=ids, **kwargs)
+        if self._index_built:
+            self.metadata_index.add(ids, metadatas or [{}] * len(ids))
+        return ids
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> None:
+        """Delete `ids` from the collection and from the metadata index."""
+        super().delete(ids=ids, **kwargs)
+        if ids and self._index_built:
+            self.metadata_index.remove(ids)
+
+    def _distances(self, query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """Distances in the collection's space, matching what Chroma returns."""
+        space = (self._collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+            return 1.0 - (vectors @ query) / np.where(norms == 0, 1, norms)
+        if space == "ip":
+            return 1.0 - vectors @ query
+        return ((vectors - query) ** 2).sum(axis=1)
+
+    def _prefiltered(self, query: str, ids: list[str], k: int) -> list[tuple[Document, float]]:
+        page = self._collection.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+        if not len(page["ids"]):
+            return []
+        vectors = np.asarray(page["embeddings"], dtype=np.float32)
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        distances = self._distances(query_vector, vectors)
+        if k < len(distances):
+            top = np.argpartition(distances, k - 1)[:k]
+            top = top[np.argsort(distances[top], kind="stable")]
+        else:
+            top = np.argsort(distances, kind="stable")
+        return [
+            (
+                Document(
+                    id=page["ids"][i],
+                    page_content=page["documents"][i] or "",
+                    metadata=page["metadatas"][i] or {},
+                ),
+                float(distances[i]),
+            )
+            for i in top
+        ]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: dict[str, str] | None = None,
+        where_document: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> list[tuple[Document, float]]:
+        """Run a similarity search, pre- or post-filtering by the filter's selectivity.
+
+        Retrievers pass the configured `prefilter_selectivity` through their
+        search_kwargs; it overrides the store's default for this search.
+        """
+        prefilter_selectivity = kwargs.pop("prefilter_selectivity", self.prefilter_selectivity)
+        if not filter or where_document is not None:
+            return super().similarity_search_with_score(
+                query, k, filter=filter or None, where_document=where_document, **kwargs)
+
+        self._refresh_index()
+        bitmap = self.metadata_index.match(filter)
+        total = len(self.metadata_index)
+        if bitmap is None or total == 0:
+            self.strategy_counts["chroma"] += 1
+            return super().similarity_search_with_score(query, k, filter=filter, **kwargs)
+
+        matches = popcount(bitmap)
+        if matches == 0:
+            return []
+        selectivity = matches / total
+        if selectivity <= prefilter_selectivity:
+            if matches <= self.max_prefilter_candidates:
+                self.strategy_counts["prefilter"] += 1
+                return self._prefiltered(query, self.metadata_index.ids(bitmap), k)
+            self.strategy_counts["chroma"] += 1
+            return super().similarity_search_with_score(query, k, filter=filter, **kwargs)
+
+        # Broad filter: enough unfiltered neighbours that about k survive the filter
+        self.strategy_counts["postfilter"] += 1
+        n_results = min(total, math.ceil(k / selectivity * self.oversample))
+        allowed = set(self.metadata_index.ids(bitmap))
+        kept = [
+            (doc, score)
+            for doc, score in super().similarity_search_with_score(query, n_results, **kwargs)
+            if doc.id in allowed
+        ]
+        if len(kept) >= min(k, matches):
+            return kept[:k]
+        self.strategy_counts["chroma"] += 1
+        return super().similarity_search_with_score(query, k, filter=filter, **kwargs)
@@ -0,0 +1,326 @@
+"""In-process vector store backed by memory-mapped NumPy files.
+
+Vectors are appended to a raw float32 file and read through `numpy.memmap`, so
+search needs no server and no network hop. Small collections are searched
+exactly; once a collection grows past `ivf_min_size` vectors an IVF
+(inverted file) index is trained with spherical k-means and queries only scan
+the `nprobe` closest clusters plus any vectors added since the last build.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from typing import Any, Callable, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+DEFAULT_LOCAL_STORE_DIR = os.environ.get("LOCAL_VECTOR_STORE_DIR", ".cache/local_vectors")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _matches(metadata: dict, filter: dict | None) -> bool:
+    return not filter or all(metadata.get(key) == value for key, value in filter.items())
+
+
+class LocalVectorStore(VectorStore):
+    """Vector store persisted to a local directory and searched in-process.
+
+    Files in `path`:
+        vectors.f32: Row-major float32 vectors, normalized for cosine similarity.
+        docs.jsonl: One record per row (id, text, metadata) plus delete tombstones.
+        meta.json: Embedding dimension.
+        ivf_*.npy: Centroids and the row order/offsets of each inverted list.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        path: str = DEFAULT_LOCAL_STORE_DIR,
+        *,
+        ivf_min_size: int = 10_000,
+        nprobe: int = 8,
+        rebuild_ratio: float = 0.2,
+    ) -> None:
+        """Open the store under `path`, replaying whatever is already on disk."""
+        self._embedding = embedding
+        self.path = path
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self.rebuild_ratio = rebuild_ratio
+        self._lock = threading.RLock()
+        self._dim: int | None = None
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadatas: list[dict] = []
+        self._rows: dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._centroids: np.ndarray | None = None
+        self._ivf_order: np.ndarray | None = None
+        self._ivf_offsets: np.ndarray | None = None
+        self._ivf_size = 0
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the model the stored vectors were embedded with."""
+        return self._embedding
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        """Replay the document log and map the vector and IVF files.
+
+        `add_texts` appends vectors before their log records, so a crash in
+        between leaves vector rows without a record, and a torn write leaves a
+        partial row or line. Both files are cut back to the rows they have in
+        common so every record stays aligned with its vector.
+        """
+        if os.path.exists(self._file("meta.json")):
+            with open(self._file("meta.json"), encoding="utf-8") as meta:
+                self._dim = json.load(meta)["dim"]
+        row_bytes = 4 * (self._dim or 0)
+        vector_path = self._file("vectors.f32")
+        vector_bytes = os.path.getsize(vector_path) if os.path.exists(vector_path) else 0
+        stored_rows = vector_bytes // row_bytes if row_bytes else 0
+        alive: list[bool] = []
+        if os.path.exists(self._file("docs.jsonl")):
+            with open(self._file("docs.jsonl"), "rb+") as log:
+                offset = 0
+                for line in log:
+                    try:
+                        record = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        record = None
+                    if record is None or ("delete" not in record and len(self._ids) == stored_rows):
+                        log.truncate(offset)
+                        break
+                    offset += len(line)
+                    if "delete" in record:
+                        row = self._rows.pop(record["delete"], None)
+                        if row is not None:
+                            alive[row] = False
+                        continue
+                    previous = self._rows.get(record["id"])
+                    if previous is not None:
+                        alive[previous] = False
+                    self._rows[record["id"]] = len(self._ids)
+                    self._ids.append(record["id"])
+                    self._texts.append(record["text"])
+                    self._metadatas.append(record["metadata"])
+                    alive.append(True)
+        if vector_bytes > len(self._ids) * row_bytes:
+            with open(vector_path, "rb+") as vector_file:
+                vector_file.truncate(len(self._ids) * row_bytes)
+        self._alive = np.array(alive, dtype=bool)
+        self._map_vectors()
+        if os.path.exists(self._file("ivf_centroids.npy")):
+            offsets = np.load(self._file("ivf_offsets.npy"))
+            # An index over rows that were cut back above is stale; search exactly.
+            if int(offsets[-1]) <= len(self._ids):
+                self._centroids = np.load(self._file("ivf_centroids.npy"), mmap_mode="r")
+                self._ivf_order = np.load(self._file("ivf_order.npy"), mmap_mode="r")
+                self._ivf_offsets = offsets
+                self._ivf_size = int(offsets[-1])
+
+    def _map_vectors(self) -> None:
+        path = self._file("vectors.f32")
+        if self._dim and os.path.exists(path) and os.path.getsize(path):
+            self._vectors = np.memmap(path, dtype=np.float32, mode="r").reshape(-1, self._dim)
+        else:
+            self._vectors = np.zeros((0, self._dim or 0), dtype=np.float32)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Embed `texts` and append them; re-adding an id replaces the old row."""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                with open(self._file("meta.json"), "w", encoding="utf-8") as meta:
+                    json.dump({"dim": self._dim}, meta)
+            # Vectors go first: on load, rows without a log record are dropped.
+            with open(self._file("vectors.f32"), "ab") as vector_file:
+                vector_file.write(vectors.tobytes())
+            self._alive = np.concatenate([self._alive, np.ones(len(texts), dtype=bool)])
+            with open(self._file("docs.jsonl"), "a", encoding="utf-8") as log:
+                for doc_id, text, metadata in zip(ids, texts, metadatas):
+                    previous = self._rows.get(doc_id)
+                    if previous is not None:
+                        self._alive[previous] = False
+                    self._rows[doc_id] = len(self._ids)
+                    self._ids.append(doc_id)
+                    self._texts.append(text)
+                    self._metadatas.append(metadata)
+                    log.write(json.dumps({"id": doc_id, "text": text, "metadata": metadata}) + "\n")
+            self._map_vectors()
+            if self._needs_rebuild():
+                self.build_index()
+        return ids
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        """Tombstone the rows stored under `ids`."""
+        if not ids:
+            return False
+        with self._lock, open(self._file("docs.jsonl"), "a", encoding="utf-8") as log:
+            for doc_id in ids:
+                row = self._rows.pop(doc_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    log.write(json.dumps({"delete": doc_id}) + "\n")
+        return True
+
+    def get_by_ids(self, ids: list[str], /) -> list[Document]:
+        """Return the live documents stored under `ids`."""
+        rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+        return [self._document(row) for row in rows]
+
+    def _document(self, row: int) -> Document:
+        return Document(
+            id=self._ids[row], page_content=self._texts[row], metadata=self._metadatas[row]
+        )
+
+    def _needs_rebuild(self) -> bool:
+        count = len(self._ids)
+        if count < self.ivf_min_size:
+            return False
+        return count - self._ivf_size > self.rebuild_ratio * max(self._ivf_size, 1)
+
+    def build_index(self, n_lists: int | None = None, iterations: int = 10) -> None:
+        """Train IVF centroids with spherical k-means and persist the inverted lists."""
+        with self._lock:
+            vectors = np.asarray(self._vectors)
+            count = len(vectors)
+            n_lists = n_lists or max(1, int(np.sqrt(count)))
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(count, size=min(count, 256 * n_lists), replace=False)]
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for cluster in range(n_lists):
+                    members = sample[assignment == cluster]
+                    if len(members):
+                        centroids[cluster] = members.sum(axis=0)
+                centroids = _normalize(centroids)
+
+            assignment = np.concatenate(
+                [
+                    np.argmax(vectors[start : start + 65536] @ centroids.T, axis=1)
+                    for start in range(0, count, 65536)
+                ]
+            )
+            order = np.argsort(assignment, kind="stable").astype(np.int64)
+            offsets = np.zeros(n_lists + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+
+            np.save(self._file("ivf_centroids.npy"), centroids.astype(np.float32))
+            np.save(self._file("ivf_order.npy"), order)
+            np.save(self._file("ivf_offsets.npy"), offsets)
+            self._centroids = np.load(self._file("ivf_centroids.npy"), mmap_mode="r")
+            self._ivf_order = np.load(self._file("ivf_order.npy"), mmap_mode="r")
+            self._ivf_offsets = offsets
+            self._ivf_size = count
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray | None:
+        """Return the rows to scan for `query`, or None to scan every row."""
+        if self._centroids is None or self._ivf_offsets is None:
+            return None
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        rows = [self._ivf_order[self._ivf_offsets[c] : self._ivf_offsets[c + 1]] for c in probes]
+        # Vectors appended after the last build are not in any list yet.
+        rows.append(np.arange(self._ivf_size, len(self._ids), dtype=np.int64))
+        return np.concatenate(rows)
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4, filter: dict | None = None
+    ) -> list[tuple[Document, float]]:
+        """Return the `k` live documents with the highest cosine similarity."""
+        with self._lock:
+            if not self._ids:
+                return []
+            query = _normalize(np.asarray(embedding, dtype=np.float32))
+            rows = self._candidates(query)
+            if rows is None:
+                rows = np.arange(len(self._ids), dtype=np.int64)
+            keep = self._alive[rows]
+            if filter:
+                keep &= np.fromiter(
+                    (_matches(self._metadatas[row], filter) for row in rows),
+                    dtype=bool,
+                    count=len(rows),
+                )
+            rows = rows[keep]
+            if not len(rows):
+                return []
+            scores = self._vectors[rows] @ query
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._document(int(rows[i])), float(scores[i])) for i in top]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: dict | None = None, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """Embed `query` and return the closest documents with their similarity."""
+        return self.similarity_search_by_vector_with_score(
+            self._embedding.embed_query(query), k=k, filter=filter
+        )
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: dict | None = None, **kwargs: Any
+    ) -> list[Document]:
+        """Embed `query` and return the closest documents."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, filter: dict | None = None, **kwargs: Any
+    ) -> list[Document]:
+        """Return the documents closest to `embedding`."""
+        return [
+            doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, filter)
+        ]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities in [-1, 1].
+        return lambda score: score
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        path: str = DEFAULT_LOCAL_STORE_DIR,
+        **kwargs: Any,
+    ) -> LocalVectorStore:
+        """Create a store in `path` and add `texts` to it."""
+        store = cls(embedding, path, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,172 @@
+"""Client-side inverted metadata index with bitmap posting lists.
+
+Every document id gets a slot number, and every (metadata key, value) pair
+gets a bitmap of the slots that carry it. Bitmaps are plain Python integers,
+so `$and` / `$or` are single `&` / `|` operations and counting the matches
+(the filter's selectivity) needs no pass over the documents.
+
+Filters use the Chroma `where` syntax: `{"key": value}`, `{"key": {"$op": value}}`
+with `$eq`, `$ne`, `$gt`, `$gte`, `$lt`, `$lte`, `$in`, `$nin`, and
+`{"$and": [...]}` / `{"$or": [...]}`.
+"""
+
+from __future__ import annotations
+
+import operator
+import threading
+from typing import Any, Iterable, Iterator, Sequence
+
+_RANGE_OPS = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+
+def _value_key(value: Any) -> Any:
+    """Key posting lists by type as well as value, so True and 1 stay apart."""
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (int, float)):
+        return ("number", float(value))
+    return ("str", str(value))
+
+
+def _iter_slots(bitmap: int) -> Iterator[int]:
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+def popcount(bitmap: int) -> int:
+    """Return the number of documents set in `bitmap`."""
+    return bin(bitmap).count("1")
+
+
+class MetadataIndex:
+    """Inverted bitmaps over document metadata, keyed by document id."""
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        self._lock = threading.RLock()
+        self.clear()
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self._slots)
+
+    def clear(self) -> None:
+        """Drop every document from the index."""
+        with self._lock:
+            self._slots: dict[str, int] = {}
+            self._ids: list[str | None] = []
+            self._metadatas: list[dict | None] = []
+            self._free: list[int] = []
+            self._alive = 0
+            # key -> value key -> bitmap of slots
+            self._postings: dict[str, dict[Any, int]] = {}
+
+    def add(self, ids: Sequence[str], metadatas: Sequence[dict | None]) -> None:
+        """Index (or re-index) the metadata of `ids`."""
+        with self._lock:
+            self.remove(ids)
+            for doc_id, metadata in zip(ids, metadatas):
+                if self._free:
+                    slot = self._free.pop()
+                    self._ids[slot] = doc_id
+                    self._metadatas[slot] = metadata or {}
+                else:
+                    slot = len(self._ids)
+                    self._ids.append(doc_id)
+                    self._metadatas.append(metadata or {})
+                self._slots[doc_id] = slot
+                bit = 1 << slot
+                self._alive |= bit
+                for key, value in (metadata or {}).items():
+                    values = self._postings.setdefault(key, {})
+                    value_key = _value_key(value)
+                    values[value_key] = values.get(value_key, 0) | bit
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Drop `ids` from the index; unknown ids are ignored."""
+        with self._lock:
+            for doc_id in ids:
+                slot = self._slots.pop(doc_id, None)
+                if slot is None:
+                    continue
+                mask = ~(1 << slot)
+                self._alive &= mask
+                for key, value in (self._metadatas[slot] or {}).items():
+                    values = self._postings.get(key, {})
+                    value_key = _value_key(value)
+                    remaining = values.get(value_key, 0) & mask
+                    if remaining:
+                        values[value_key] = remaining
+                    else:
+                        values.pop(value_key, None)
+                self._ids[slot] = None
+                self._metadatas[slot] = None
+                self._free.append(slot)
+
+    def _present(self, key: str) -> int:
+        bitmap = 0
+        for value_bitmap in self._postings.get(key, {}).values():
+            bitmap |= value_bitmap
+        return bitmap
+
+    def _compare(self, key: str, op: str, target: Any) -> int | None:
+        values = self._postings.get(key, {})
+        if op == "$eq":
+            return values.get(_value_key(target), 0)
+        if op == "$ne":
+            return self._present(key) & ~values.get(_value_key(target), 0)
+        if op in ("$in", "$nin"):
+            bitmap = 0
+            for item in target:
+                bitmap |= values.get(_value_key(item), 0)
+            return bitmap if op == "$in" else self._present(key) & ~bitmap
+        if op in _RANGE_OPS:
+            target_key = _value_key(target)
+            compare = _RANGE_OPS[op]
+            bitmap = 0
+            for (kind, value), value_bitmap in values.items():
+                if kind == target_key[0] and compare(value, target_key[1]):
+                    bitmap |= value_bitmap
+            return bitmap
+        return None
+
+    def match(self, where: dict) -> int | None:
+        """Return the bitmap of documents matching `where`, or None if unsupported."""
+        with self._lock:
+            return self._match(where)
+
+    def _match(self, where: dict) -> int | None:
+        result = self._alive
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._match(part) for part in condition]
+                if any(part is None for part in parts):
+                    return None
+                bitmap = 0 if key == "$or" else self._alive
+                for part in parts:
+                    bitmap = bitmap | part if key == "$or" else bitmap & part
+            elif key.startswith("$"):
+                return None
+            elif isinstance(condition, dict):
+                if len(condition) != 1:
+                    return None
+                (op, target), = condition.items()
+                bitmap = self._compare(key, op, target)
+                if bitmap is None:
+                    return None
+            else:
+                bitmap = self._compare(key, "$eq", condition)
+            result &= bitmap
+        return result
+
+    def ids(self, bitmap: int) -> list[str]:
+        """Document ids for the set bits of `bitmap`."""
+        with self._lock:
+            return [self._ids[slot] for slot in _iter_slots(bitmap & self._alive)]
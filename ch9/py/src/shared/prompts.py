@@ -0,0 +1,121 @@
+"""Resolve LangChain Hub prompts once and serve them from memory and disk."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.load import dumps, loads
+from langchain_core.prompts import BasePromptTemplate
+
+DEFAULT_PROMPT_CACHE_DIR = os.environ.get("PROMPT_CACHE_DIR", ".cache/prompts")
+
+
+def _offline_from_env() -> bool:
+    return os.environ.get("PROMPT_REGISTRY_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+class PromptRegistry:
+    """Registry of hub prompts backed by a versioned on-disk cache.
+
+    Prompts are identified the same way as in `langchain.hub.pull`, e.g.
+    "rlm/rag-prompt" or "rlm/rag-prompt:50442af1" to pin a commit. The first
+    resolution of an identifier is written to
+    `<cache_dir>/<owner>/<name>/<commit>.json` and recorded as the latest
+    version; afterwards it is served from memory. In offline mode the network
+    is never touched and only cached versions can be resolved.
+    """
+
+    def __init__(
+        self, cache_dir: str = DEFAULT_PROMPT_CACHE_DIR, offline: Optional[bool] = None
+    ) -> None:
+        """Use `cache_dir`; `offline=None` reads PROMPT_REGISTRY_OFFLINE."""
+        self.cache_dir = Path(cache_dir)
+        self.offline = _offline_from_env() if offline is None else offline
+        self._prompts: dict[str, BasePromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def _prompt_dir(self, name: str) -> Path:
+        return self.cache_dir.joinpath(*name.split("/"))
+
+    def _read(self, name: str, version: Optional[str]) -> Optional[BasePromptTemplate]:
+        """Load `version` of `name` from disk, or the latest version if not pinned."""
+        prompt_dir = self._prompt_dir(name)
+        if version is None:
+            latest = prompt_dir / "latest"
+            if not latest.exists():
+                return None
+            version = latest.read_text(encoding="utf-8").strip()
+        path = prompt_dir / f"{version}.json"
+        if not path.exists():
+            return None
+        return loads(path.read_text(encoding="utf-8"))
+
+    def _write(self, name: str, prompt: BasePromptTemplate, pinned: Optional[str]) -> None:
+        """Persist a pulled prompt under its commit hash and mark it as latest."""
+        version = pinned or (prompt.metadata or {}).get("lc_hub_commit_hash") or "unversioned"
+        prompt_dir = self._prompt_dir(name)
+        prompt_dir.mkdir(parents=True, exist_ok=True)
+        (prompt_dir / f"{version}.json").write_text(dumps(prompt), encoding="utf-8")
+        if pinned is None:
+            (prompt_dir / "latest").write_text(version, encoding="utf-8")
+
+    def _pull(self, identifier: str) -> BasePromptTemplate:
+        from langchain import hub
+
+        return hub.pull(identifier)
+
+    def get(self, identifier: str, *, refresh: bool = False) -> BasePromptTemplate:
+        """Return the prompt for `identifier`, pulling it from the hub at most once.
+
+        Args:
+            identifier (str): Hub prompt identifier, optionally pinned with ":<commit>".
+            refresh (bool): Pull the prompt again even if a cached copy exists.
+                Ignored in offline mode.
+
+        Raises:
+            LookupError: If the registry is offline and no cached copy exists.
+        """
+        name, _, version = identifier.partition(":")
+        version = version or None
+        with self._lock:
+            if not refresh and identifier in self._prompts:
+                return self._prompts[identifier]
+
+            prompt = None if refresh and not self.offline else self._read(name, version)
+            if prompt is None:
+                if self.offline:
+                    raise LookupError(
+                        f"Prompt {identifier!r} is not cached in {self.cache_dir} "
+                        "and the prompt registry is offline."
+                    )
+                try:
+                    prompt = self._pull(identifier)
+                except Exception:
+                    # Fall back to whatever we have on disk if the hub is unreachable.
+                    prompt = self._read(name, version)
+                    if prompt is None:
+                        raise
+                else:
+                    self._write(name, prompt, version)
+
+            self._prompts[identifier] = prompt
+            return prompt
+
+    def versions(self, name: str) -> list[str]:
+        """List the cached versions of `name`."""
+        prompt_dir = self._prompt_dir(name)
+        if not prompt_dir.exists():
+            return []
+        return sorted(path.stem for path in prompt_dir.glob("*.json"))
+
+
+_default_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt(identifier: str) -> BasePromptTemplate:
+    """Resolve a hub prompt through the process-wide prompt registry."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = PromptRegistry()
+    return _default_registry.get(identifier)
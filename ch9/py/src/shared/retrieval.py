@@ -1,20 +1,22 @@
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
+import atexit
+import json
 import os
+import threading
+from typing import Any, Callable
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
-from langchain_chroma import Chroma
 from langchain_core.embeddings import Embeddings
 from langchain_core.runnables import RunnableConfig
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import SupabaseVectorStore
-from langchain_chroma import Chroma
-from supabase import create_client
-import chromadb
-
 
 from ingestion_graph.configuration import IndexConfiguration
+from shared.embedding_cache import CachedEmbeddings
+
+# Provider SDKs (chromadb, supabase, langchain_google_genai, numpy for the local
+# store) are imported inside the factories that need them, so starting a graph
+# only pays for the providers it actually uses.
 
 
 def make_text_encoder(model: str) -> Embeddings:
@@ -23,16 +25,48 @@ def make_text_encoder(model: str) -> Embeddings:
     if provider == "openai":
         from langchain_google_genai import GoogleGenerativeAIEmbeddings
         # Use Google Gemini instead of OpenAI
-        return GoogleGenerativeAIEmbeddings(
+        encoder = GoogleGenerativeAIEmbeddings(
             model="models/embedding-001",
             google_api_key=os.getenv("GOOGLE_API_KEY")
         )
+        # Serve previously embedded texts from the local on-disk cache
+        return CachedEmbeddings(encoder, namespace="google/models/embedding-001")
     else:
         raise ValueError(f"Unsupported embedding provider: {provider}")
 
 
+# Process-wide pools so clients, HTTP connections and retrievers are built once
+# per configuration and reused across graph runs.
+_POOL_LOCK = threading.RLock()
+_CLIENTS: dict[tuple, Any] = {}
+_ENCODERS: dict[str, Embeddings] = {}
+_RETRIEVERS: dict[tuple, Any] = {}
+
+
+def _pooled(pool: dict, key: Any, factory: Callable[[], Any]) -> Any:
+    """Return the pooled object for `key`, building it with `factory` on first use."""
+    with _POOL_LOCK:
+        if key not in pool:
+            pool[key] = factory()
+        return pool[key]
+
+
+def _retriever_key(configuration: IndexConfiguration) -> tuple:
+    """Build the pool key for the configuration fields that shape a retriever."""
+    search_kwargs = json.dumps(configuration.search_kwargs, sort_keys=True, default=repr)
+    return (
+        configuration.retriever_provider,
+        configuration.embedding_model,
+        search_kwargs,
+        configuration.prefilter_selectivity,
+    )
+
+
 @contextmanager
 def make_supabase_retriever(configuration: RunnableConfig, embedding_model: Embeddings):
+    from langchain_community.vectorstores import SupabaseVectorStore
+    from supabase import create_client
+
     supabase_url = os.environ.get("SUPABASE_URL")
     supabase_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
 
@@ -40,7 +74,11 @@ def make_supabase_retriever(configuration: RunnableConfig, embedding_model: Embe
         raise ValueError(
             "Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY env variables")
 
-    client = create_client(supabase_url, supabase_key)
+    client = _pooled(
+        _CLIENTS,
+        ("supabase", supabase_url),
+        lambda: create_client(supabase_url, supabase_key),
+    )
     vectorstore = SupabaseVectorStore(
         client=client, embedding=embedding_model, table_name="documents", query_name="match_documents")
     search_kwargs = configuration.search_kwargs
@@ -49,34 +87,129 @@ def make_supabase_retriever(configuration: RunnableConfig, embedding_model: Embe
 
 @contextmanager
 def make_chroma_retriever(configuration: IndexConfiguration, embedding_model: Embeddings):
-    client = chromadb.HttpClient(host='localhost', port=8000)
+    """Yield a retriever over the Chroma server's pooled `documents` collection."""
+    import chromadb
+
+    from shared.indexed_chroma import IndexedChroma
 
-    vectorstore = Chroma(
-        collection_name="documents",
-        embedding_function=embedding_model,
-        client=client
+    client = _pooled(
+        _CLIENTS,
+        ("chroma", "localhost", 8000),
+        lambda: chromadb.HttpClient(host='localhost', port=8000),
     )
-    search_kwargs = configuration.search_kwargs
-    search_filter = search_kwargs.setdefault("filter", {})
-    yield vectorstore.as_retriever(search_kwargs=search_kwargs)
+
+    # One store per collection and encoder, so documents ingested through any
+    # retriever update the metadata index that filtered searches use.
+    vectorstore = _pooled(
+        _CLIENTS,
+        ("chroma-collection", "documents", configuration.embedding_model),
+        lambda: IndexedChroma(
+            collection_name="documents",
+            embedding_function=embedding_model,
+            client=client,
+        ),
+    )
+    # Copy so the configuration's dict is never modified; an empty filter is no filter.
+    search_kwargs = {
+        key: value for key, value in configuration.search_kwargs.items()
+        if not (key == "filter" and not value)
+    }
+    retriever = vectorstore.as_retriever(search_kwargs=search_kwargs)
+    # Only similarity search goes through IndexedChroma's filter strategies;
+    # the other search types would pass the threshold on to Chroma itself.
+    if retriever.search_type == "similarity":
+        retriever.search_kwargs["prefilter_selectivity"] = configuration.prefilter_selectivity
+    yield retriever
 
 
 @contextmanager
-def make_retriever(
-    config: RunnableConfig,
-):
-    """Create a retriever for the agent, based on the current configuration."""
-    configuration = IndexConfiguration.from_runnable_config(config)
-    embedding_model = make_text_encoder(configuration.embedding_model)
-    if configuration.retriever_provider == "supabase":
-        with make_supabase_retriever(configuration, embedding_model) as retriever:
-            yield retriever
-    elif configuration.retriever_provider == "chroma":
-        with make_chroma_retriever(configuration, embedding_model) as retriever:
-            yield retriever
-    else:
+def make_local_retriever(configuration: IndexConfiguration, embedding_model: Embeddings):
+    """Yield a retriever over the pooled in-process vector store."""
+    from shared.local_store import DEFAULT_LOCAL_STORE_DIR, LocalVectorStore
+
+    vectorstore = _pooled(
+        _CLIENTS,
+        ("local", DEFAULT_LOCAL_STORE_DIR, configuration.embedding_model),
+        lambda: LocalVectorStore(embedding_model, DEFAULT_LOCAL_STORE_DIR),
+    )
+    yield vectorstore.as_retriever(search_kwargs=configuration.search_kwargs)
+
+
+_RETRIEVER_FACTORIES = {
+    "supabase": make_supabase_retriever,
+    "chroma": make_chroma_retriever,
+    "local": make_local_retriever,
+}
+
+
+def register_retriever_provider(name: str, factory: Callable) -> None:
+    """Register a retriever provider plugin under `name`.
+
+    `factory` is a context manager function taking the configuration and the
+    embedding model and yielding a retriever, like `make_chroma_retriever`.
+    Import the provider's SDK inside the factory to keep startup lazy.
+    """
+    _RETRIEVER_FACTORIES[name] = factory
+
+
+def get_text_encoder(model: str) -> Embeddings:
+    """Return the process-wide text encoder for `model`."""
+    return _pooled(_ENCODERS, model, lambda: make_text_encoder(model))
+
+
+def _build_retriever(configuration: IndexConfiguration):
+    """Build a retriever for `configuration` from pooled encoders and clients."""
+    embedding_model = get_text_encoder(configuration.embedding_model)
+    factory = _RETRIEVER_FACTORIES.get(configuration.retriever_provider)
+    if factory is None:
         raise ValueError(
             "Unrecognized retriever_provider in configuration. "
-            f"Expected one of: {', '.join(Configuration.__annotations__['retriever_provider'].__args__)}\n"
+            f"Expected one of: {', '.join(_RETRIEVER_FACTORIES)}\n"
             f"Got: {configuration.retriever_provider}"
         )
+    with factory(configuration, embedding_model) as retriever:
+        return retriever
+
+
+@contextmanager
+def make_retriever(
+    config: RunnableConfig,
+):
+    """Create a retriever for the agent, based on the current configuration.
+
+    Retrievers are pooled per (provider, embedding_model, search_kwargs), so
+    repeated graph runs with the same configuration share one retriever and
+    its underlying client connections.
+    """
+    configuration = IndexConfiguration.from_runnable_config(config)
+    key = _retriever_key(configuration)
+    yield _pooled(_RETRIEVERS, key, lambda: _build_retriever(configuration))
+
+
+def close_retrievers() -> None:
+    """Drop every pooled retriever and close the clients they share.
+
+    Registered with `atexit` so connections are released when the server shuts down.
+    """
+    with _POOL_LOCK:
+        clients = list(_CLIENTS.items())
+        encoders = list(_ENCODERS.values())
+        _RETRIEVERS.clear()
+        _CLIENTS.clear()
+        _ENCODERS.clear()
+
+    for (provider, *_), client in clients:
+        # Shutdown must not fail because a connection is already gone.
+        with suppress(Exception):
+            if provider == "supabase":
+                client.postgrest.session.close()
+            elif provider == "chroma":
+                client.clear_system_cache()
+    for encoder in encoders:
+        close = getattr(encoder, "close", None)
+        if callable(close):
+            with suppress(Exception):
+                close()
+
+
+atexit.register(close_retrievers)
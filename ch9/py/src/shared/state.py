@@ -2,7 +2,7 @@
 
 import hashlib
 import uuid
-from typing import Any, Literal, Optional, Union
+from typing import Any, Iterable, Literal, Optional, Union
 
 from langchain_core.documents import Document
 
@@ -16,6 +16,49 @@ def _generate_uuid(page_content: str) -> str:
     return str(uuid.UUID(md5_hash))
 
 
+class DocumentCollection(list):
+    """A list of documents with a persistent uuid -> position index.
+
+    `reduce_docs` returns this type and carries the index over from one call
+    to the next, so membership checks and appends cost O(1) per new document
+    instead of re-reading the metadata of the accumulated state on every
+    reducer call. A plain list (for example one restored from a checkpoint)
+    is indexed once on first use.
+    """
+
+    def __init__(self, docs: Iterable[Document] = ()) -> None:
+        """Index `docs` by their `uuid` metadata."""
+        super().__init__(docs)
+        self._positions: dict[str, int] = {}
+        for position, doc in enumerate(self):
+            self._positions.setdefault(doc.metadata.get("uuid"), position)
+
+    def has_id(self, doc_id: str) -> bool:
+        """Return whether a document with `doc_id` is already in the collection."""
+        return doc_id in self._positions
+
+    def get_by_id(self, doc_id: str) -> Optional[Document]:
+        """Return the first document stored under `doc_id`, if any."""
+        position = self._positions.get(doc_id)
+        return None if position is None else self[position]
+
+    def add(self, doc: Document, doc_id: str) -> None:
+        """Append `doc` and index it under `doc_id`."""
+        self._positions.setdefault(doc_id, len(self))
+        self.append(doc)
+
+    def copy(self) -> "DocumentCollection":
+        """Return a shallow copy that shares the documents but not the index."""
+        clone = DocumentCollection()
+        clone.extend(self)
+        clone._positions = dict(self._positions)
+        return clone
+
+    def __reduce_ex__(self, protocol):
+        """Pickle as a plain list of documents; the index is rebuilt on load."""
+        return (self.__class__, (list(self),))
+
+
 def reduce_docs(
     existing: Optional[list[Document]],
     new: Union[
@@ -32,29 +75,36 @@ def reduce_docs(
     It can delete existing documents, create new ones from strings or dictionaries, or return the existing documents.
     It also combines existing documents with the new one based on the document ID.
 
+    The result is a new `DocumentCollection`; `existing` is never modified,
+    since checkpoints and streamed state snapshots may still refer to it. When
+    `existing` already is a `DocumentCollection` its index is copied rather
+    than rebuilt, so apart from two flat copies the cost of a call scales with
+    the size of `new` rather than with the accumulated state.
+
     Args:
         existing (Optional[Sequence[Document]]): The existing docs in the state, if any.
         new (Union[Sequence[Document], Sequence[dict[str, Any]], Sequence[str], str, Literal["delete"]]):
             The new input to process. Can be a sequence of Documents, dictionaries, strings, a single string,
             or the literal "delete".
     """
-    if new == "delete":
-        return []
+    if isinstance(new, str) and new == "delete":
+        return DocumentCollection()
+
+    if isinstance(existing, DocumentCollection):
+        collection = existing.copy()
+    else:
+        collection = DocumentCollection(existing or [])
 
-    existing_list = list(existing) if existing else []
     if isinstance(new, str):
-        return existing_list + [
-            Document(page_content=new, metadata={"uuid": _generate_uuid(new)})
-        ]
+        item_id = _generate_uuid(new)
+        collection.add(Document(page_content=new, metadata={"uuid": item_id}), item_id)
+        return collection
 
-    new_list = []
     if isinstance(new, list):
-        existing_ids = set(doc.metadata.get("uuid") for doc in existing_list)
         for item in new:
             if isinstance(item, str):
                 item_id = _generate_uuid(item)
-                new_list.append(Document(page_content=item, metadata={"uuid": item_id}))
-                existing_ids.add(item_id)
+                collection.add(Document(page_content=item, metadata={"uuid": item_id}), item_id)
 
             elif isinstance(item, dict):
                 metadata = item.get("metadata", {})
@@ -62,23 +112,24 @@ def reduce_docs(
                     item.get("page_content", "")
                 )
 
-                if item_id not in existing_ids:
-                    new_list.append(
-                        Document(**{**item, "metadata": {**metadata, "uuid": item_id}})
+                if not collection.has_id(item_id):
+                    collection.add(
+                        Document(**{**item, "metadata": {**metadata, "uuid": item_id}}),
+                        item_id,
                     )
-                    existing_ids.add(item_id)
 
             elif isinstance(item, Document):
                 item_id = item.metadata.get("uuid", "")
                 if not item_id:
                     item_id = _generate_uuid(item.page_content)
-                    new_item = item.copy(deep=True)
-                    new_item.metadata["uuid"] = item_id
+                    # Copy only the metadata dict; the page content is shared.
+                    new_item = item.model_copy(
+                        update={"metadata": {**item.metadata, "uuid": item_id}}
+                    )
                 else:
                     new_item = item
 
-                if item_id not in existing_ids:
-                    new_list.append(new_item)
-                    existing_ids.add(item_id)
+                if not collection.has_id(item_id):
+                    collection.add(new_item, item_id)
 
-    return existing_list + new_list
+    return collection
@@ -0,0 +1,48 @@
+import sqlite3
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from shared.embedding_cache import CachedEmbeddings
+
+
+def _cache(tmp_path, **kwargs):
+    return CachedEmbeddings(
+        DeterministicFakeEmbedding(size=4),
+        namespace="fake",
+        path=str(tmp_path / "embeddings.sqlite3"),
+        **kwargs,
+    )
+
+
+def _last_used(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT key, last_used FROM embeddings"))
+
+
+def test_hits_do_not_write_until_flushed(tmp_path):
+    cache = _cache(tmp_path)
+    cache.embed_documents(["a", "b", "a"])
+    before = _last_used(cache.path)
+
+    cache.embed_documents(["a", "b"])
+    assert _last_used(cache.path) == before
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_ratio": 0.5, "size": 2}
+
+    cache.close()
+    after = _last_used(cache.path)
+    assert all(after[key] > before[key] for key in before)
+
+
+def test_eviction_keeps_the_count_bounded_and_drops_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_entries=10)
+    cache.embed_documents([f"old {i}" for i in range(5)])
+    cache.embed_documents([f"new {i}" for i in range(5)])
+    # Touch the old vectors so the new ones are least recently used
+    cache.embed_documents([f"old {i}" for i in range(5)])
+    cache.embed_documents(["overflow"])
+
+    assert cache._count == cache.stats()["size"] == 9
+    misses = cache.misses
+    cache.embed_documents([f"old {i}" for i in range(5)] + ["overflow"])
+    assert cache.misses == misses
+    cache.close()
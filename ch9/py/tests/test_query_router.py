@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from retrieval_graph import graph
+from retrieval_graph.hybrid_router import CentroidClassifier, HybridRouter
+
+OFF_TOPIC = ["What's the capital of France?", "What is the weather?"]
+
+
+class FakeRouterModel:
+    def __init__(self, route):
+        self.route = route
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return graph.Schema(route=self.route, direct_answer="Paris.")
+
+
+@pytest.fixture
+def router_config(tmp_path):
+    graph._query_router.cache_clear()
+    yield {
+        "configurable": {
+            "local_router": True,
+            "local_router_log": str(tmp_path / "decisions.jsonl"),
+        }
+    }
+    graph._query_router.cache_clear()
+
+
+@pytest.mark.parametrize("query", OFF_TOPIC)
+def test_off_topic_questions_fall_through_to_the_llm(monkeypatch, router_config, query):
+    model = FakeRouterModel("direct")
+    monkeypatch.setattr(graph, "load_structured_model", lambda name, schema: model)
+
+    result = asyncio.run(graph.check_query_type({"query": query}, config=router_config))
+
+    assert model.calls == 1
+    assert result["route"] == graph.END
+
+
+def test_seed_classifier_is_confident_but_not_trusted():
+    classifier = CentroidClassifier(
+        {"retrieve": ["Summarize the section about pricing."], "direct": ["Hello, how are you?"]}
+    )
+    router = HybridRouter(classifier, threshold=0.5, min_examples=2)
+    assert classifier.predict("Summarize the section about refunds.")[0] == "retrieve"
+    assert router.predict("Summarize the section about refunds.") is None
+
+    router.record("Summarize the section about returns.", "retrieve")
+    router.record("Thanks!", "direct")
+    assert router.predict("Summarize the section about refunds.") == "retrieve"
+    assert router.stats()["llm_decisions"] == 2
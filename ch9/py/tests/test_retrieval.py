@@ -0,0 +1,52 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from shared import local_store, retrieval
+
+
+@pytest.fixture(autouse=True)
+def fake_encoder(monkeypatch):
+    monkeypatch.setattr(
+        retrieval, "get_text_encoder", lambda model: DeterministicFakeEmbedding(size=16)
+    )
+    yield
+    retrieval.close_retrievers()
+
+
+def test_make_retriever_local(monkeypatch, tmp_path):
+    monkeypatch.setattr(local_store, "DEFAULT_LOCAL_STORE_DIR", str(tmp_path))
+    config = {"configurable": {"retriever_provider": "local", "search_kwargs": {"k": 1}}}
+
+    with retrieval.make_retriever(config) as retriever:
+        retriever.vectorstore.add_texts(["alpha", "beta"])
+        docs = retriever.invoke("alpha")
+    with retrieval.make_retriever(config) as pooled:
+        assert pooled is retriever
+
+    assert [doc.page_content for doc in docs] == ["alpha"]
+    assert "prefilter_selectivity" not in retriever.search_kwargs
+
+
+def test_make_retriever_chroma(monkeypatch):
+    chromadb = pytest.importorskip("chromadb")
+    pytest.importorskip("langchain_chroma")
+    monkeypatch.setattr(chromadb, "HttpClient", lambda **kwargs: chromadb.EphemeralClient())
+    search_kwargs = {"k": 1, "filter": {"topic": "b"}}
+    config = {
+        "configurable": {
+            "retriever_provider": "chroma",
+            "search_kwargs": search_kwargs,
+            "prefilter_selectivity": 0.5,
+        }
+    }
+
+    with retrieval.make_retriever(config) as retriever:
+        retriever.vectorstore.add_texts(
+            ["alpha", "beta"], metadatas=[{"topic": "a"}, {"topic": "b"}]
+        )
+        docs = retriever.invoke("alpha")
+
+    assert [doc.page_content for doc in docs] == ["beta"]
+    assert retriever.search_kwargs["prefilter_selectivity"] == 0.5
+    assert retriever.vectorstore.strategy_counts["prefilter"] == 1
+    assert search_kwargs == {"k": 1, "filter": {"topic": "b"}}
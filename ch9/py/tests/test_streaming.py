@@ -0,0 +1,30 @@
+import asyncio
+import json
+import threading
+
+from ingestion_graph.streaming import iter_serialized_docs, stream_ingest
+
+
+def test_stream_ingest_skips_repeats_within_the_dedupe_window(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    texts = ["a", "b", "a", "c", "d", "e", "a"]
+    path.write_text("\n".join(json.dumps({"page_content": t}) for t in texts))
+    stored = []
+    reader_threads = set()
+
+    def read():
+        for item in iter_serialized_docs(str(path)):
+            reader_threads.add(threading.get_ident())
+            yield item
+
+    async def add_documents(docs):
+        stored.extend(doc.page_content for doc in docs)
+
+    progress = asyncio.run(
+        stream_ingest(add_documents, read(), batch_size=2, dedupe_window=3)
+    )
+
+    # The second "a" is within the window; by the third, c, d and e pushed it out
+    assert stored == ["a", "b", "c", "d", "e", "a"]
+    assert (progress.documents, progress.skipped) == (6, 1)
+    assert threading.get_ident() not in reader_threads